@@ -0,0 +1,226 @@
+"""
+End-to-end benchmark: many simulated users driving the real FastAPI app.
+
+Each user registers, logs in, creates a story, continues it a few times, lists
+their stories and fetches the story. Requests go through httpx's ASGI transport
+into `src.main.app` (lifespan included), so routing, validation, auth, the graphs
+and MongoDB access are all exercised; only the model is replaced by the fake
+provider (LLM_PROVIDER=fake, latency shaped by the FAKE_LLM_* settings).
+
+MongoDB must be reachable at MONGODB_URI (a local `mongod` is enough). Every run
+uses a throwaway database that is dropped at the end unless --keep-db is given.
+
+Results are written as JSON (per-route p50/p95/p99, requests/s, event-loop lag,
+memory) so runs can be compared between commits:
+
+    python -m benchmarks.bench_api --users 50 --output before.json
+    python -m benchmarks.bench_api --users 50 --output after.json --compare before.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+import uuid
+
+# Settings are read when src.config is imported, so pick the benchmark defaults first
+os.environ.setdefault("LLM_PROVIDER", "fake")
+os.environ.setdefault("LLM_CACHE_ENABLED", "false")   # fake replies are identical, caching would hide the work
+os.environ.setdefault("MONGODB_DB_NAME", f"bench_{uuid.uuid4().hex[:12]}")
+
+import httpx
+
+from src.config import LLM_PROVIDER, MONGODB_DB_NAME
+from src.database.connection import get_db
+from src.main import app
+
+PROMPTS = [
+    "A salvage crew finds a sealed vault beneath a flooded city",
+    "Two rival botanists compete for a flower that blooms once a century",
+    "A lighthouse keeper receives letters from a ship that sank decades ago",
+]
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+
+    async def request(self, client: httpx.AsyncClient, route: str, method: str, url: str, **kwargs) -> httpx.Response:
+        start = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        self.latencies.setdefault(route, []).append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            key = f"{route} {response.status_code}"
+            self.errors[key] = self.errors.get(key, 0) + 1
+        return response
+
+    def summary(self) -> dict:
+        routes = {}
+        for route, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            routes[route] = {
+                "count": len(values),
+                "p50_ms": percentile(values, 50) * 1e3,
+                "p95_ms": percentile(values, 95) * 1e3,
+                "p99_ms": percentile(values, 99) * 1e3,
+                "max_ms": values[-1] * 1e3,
+            }
+        return routes
+
+
+async def monitor_loop_lag(samples: list, interval: float = 0.01):
+    """Measure how late the event loop wakes a sleeping task."""
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(max(time.perf_counter() - start - interval, 0))
+
+
+async def simulated_user(client: httpx.AsyncClient, recorder: Recorder, number: int, continues: int):
+    username = f"bench_{number}_{uuid.uuid4().hex[:8]}"
+    password = "correct horse battery staple"
+
+    await recorder.request(client, "POST /auth/register", "POST", "/auth/register", json={
+        "username": username, "email": f"{username}@example.com", "password": password,
+    })
+    response = await recorder.request(client, "POST /auth/login", "POST", "/auth/login", data={
+        "username": username, "password": password,
+    })
+    if response.status_code != 200:
+        return
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    response = await recorder.request(client, "POST /stories/new", "POST", "/stories/new",
+                                      json={"prompt": PROMPTS[number % len(PROMPTS)]}, headers=headers)
+    if response.status_code != 200:
+        return
+    story_id = response.json()["story_id"]
+
+    for turn in range(continues):
+        await recorder.request(client, "POST /stories/{id}/continue", "POST", f"/stories/{story_id}/continue",
+                               json={"prompt": f"Turn {turn}: raise the stakes"}, headers=headers)
+
+    await recorder.request(client, "GET /stories/", "GET", "/stories/", headers=headers)
+    await recorder.request(client, "GET /stories/{id}", "GET", f"/stories/{story_id}", headers=headers)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def run(users: int, concurrency: int, continues: int, keep_db: bool) -> dict:
+    recorder = Recorder()
+    lag_samples = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited_user(number: int):
+        async with semaphore:
+            await simulated_user(client, recorder, number, continues)
+
+    tracemalloc.start()
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            monitor = asyncio.create_task(monitor_loop_lag(lag_samples))
+            start = time.perf_counter()
+            await asyncio.gather(*(limited_user(n) for n in range(users)))
+            elapsed = time.perf_counter() - start
+            monitor.cancel()
+
+        if not keep_db:
+            db = await get_db()
+            await db.client.drop_database(MONGODB_DB_NAME)
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    max_rss_mb = max_rss / (1024 * 1024) if sys.platform == "darwin" else max_rss / 1024
+
+    total_requests = sum(len(values) for values in recorder.latencies.values())
+    lag_samples.sort()
+    return {
+        "commit": git_commit(),
+        "config": {
+            "users": users,
+            "concurrency": concurrency,
+            "continues": continues,
+            "llm_provider": LLM_PROVIDER,
+            "fake_llm": {key: value for key, value in os.environ.items() if key.startswith("FAKE_LLM_")},
+        },
+        "duration_s": elapsed,
+        "requests": total_requests,
+        "requests_per_s": total_requests / elapsed if elapsed else 0.0,
+        "errors": recorder.errors,
+        "routes": recorder.summary(),
+        "event_loop_lag_ms": {
+            "p50": percentile(lag_samples, 50) * 1e3,
+            "p99": percentile(lag_samples, 99) * 1e3,
+            "max": (lag_samples[-1] if lag_samples else 0.0) * 1e3,
+        },
+        "memory": {"max_rss_mb": max_rss_mb, "traced_peak_mb": traced_peak / (1024 * 1024)},
+    }
+
+
+def print_report(results: dict, baseline: dict = None):
+    print(f"{results['requests']} requests in {results['duration_s']:.2f} s "
+          f"({results['requests_per_s']:.1f} req/s), commit {results['commit']}", file=sys.stderr)
+    for route, stats in results["routes"].items():
+        line = (f"{route:<30} n={stats['count']:<5} p50 {stats['p50_ms']:8.1f} ms   "
+                f"p95 {stats['p95_ms']:8.1f} ms   p99 {stats['p99_ms']:8.1f} ms")
+        before = (baseline or {}).get("routes", {}).get(route)
+        if before and before["p95_ms"]:
+            line += f"   p95 {(stats['p95_ms'] / before['p95_ms'] - 1) * 100:+6.1f}%"
+        print(line, file=sys.stderr)
+    lag, memory = results["event_loop_lag_ms"], results["memory"]
+    print(f"event loop lag p50 {lag['p50']:.1f} ms, p99 {lag['p99']:.1f} ms, max {lag['max']:.1f} ms", file=sys.stderr)
+    print(f"max RSS {memory['max_rss_mb']:.1f} MB, traced peak {memory['traced_peak_mb']:.1f} MB", file=sys.stderr)
+    if results["errors"]:
+        print(f"errors: {results['errors']}", file=sys.stderr)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20, help="simulated users")
+    parser.add_argument("--concurrency", type=int, default=20, help="users active at the same time")
+    parser.add_argument("--continues", type=int, default=2, help="continuations per story")
+    parser.add_argument("--output", help="write the JSON results here instead of stdout")
+    parser.add_argument("--compare", help="JSON results of an earlier run to diff p95 against")
+    parser.add_argument("--keep-db", action="store_true", help="do not drop the benchmark database")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.users, args.concurrency, args.continues, args.keep_db))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+    return 1 if results["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""
+Benchmark: story-request latency while a burst of logins is being verified.
+
+A "story request" here is a coroutine that awaits a simulated upstream LLM call
+(asyncio.sleep), which is what a story generation spends its time doing. While a
+stream of story requests runs, a login storm verifies bcrypt hashes either inline
+on the event loop (the old behaviour) or through src.auth.hashing's thread pool.
+
+    python -m benchmarks.bench_login_storm [logins] [story_requests]
+"""
+import asyncio
+import statistics
+import sys
+import time
+
+from src.auth.hashing import pwd_context, verify_password, hashing_stats
+
+UPSTREAM_LATENCY = 0.05
+
+
+async def story_request(latencies: list):
+    start = time.perf_counter()
+    await asyncio.sleep(UPSTREAM_LATENCY)
+    latencies.append(time.perf_counter() - start)
+
+
+async def inline_login(hashed: str):
+    pwd_context.verify("correct horse", hashed)
+
+
+async def pooled_login(hashed: str):
+    await verify_password("correct horse", hashed)
+
+
+async def run(login, logins: int, story_requests: int, hashed: str) -> list:
+    latencies = []
+
+    async def arriving_login(delay: float):
+        await asyncio.sleep(delay)
+        await login(hashed)
+
+    async def storm():
+        # Spread the logins over the window in which story requests are running
+        window = story_requests * UPSTREAM_LATENCY
+        await asyncio.gather(*(arriving_login(window * i / max(logins, 1)) for i in range(logins)))
+
+    async def stories():
+        for _ in range(story_requests):
+            await asyncio.gather(*(story_request(latencies) for _ in range(5)))
+
+    await asyncio.gather(storm(), stories())
+    return latencies
+
+
+def report(name: str, latencies: list):
+    latencies = sorted(latencies)
+    p50 = statistics.median(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{name:<22} p50 {p50 * 1e3:7.1f} ms   p95 {p95 * 1e3:7.1f} ms   max {latencies[-1] * 1e3:7.1f} ms")
+
+
+def main():
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    story_requests = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    hashed = pwd_context.hash("correct horse")
+
+    print(f"{logins} logins during {story_requests * 5} story requests "
+          f"(upstream latency {UPSTREAM_LATENCY * 1e3:.0f} ms)")
+    report("no login storm", asyncio.run(run(lambda h: asyncio.sleep(0), 0, story_requests, hashed)))
+    report("inline bcrypt", asyncio.run(run(inline_login, logins, story_requests, hashed)))
+    report("bcrypt worker pool", asyncio.run(run(pooled_login, logins, story_requests, hashed)))
+    print(f"pool stats: {hashing_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Startup benchmark: how long `import src.main` takes and how much memory it leaves behind.
+
+Every run imports the app in a fresh interpreter (a cold start as an autoscaled
+worker sees it, minus the OS page cache), then optionally builds the configured
+model with get_llm() to show what the first LLM call adds on top. Reported per
+phase: median/min/max wall time and max RSS, plus which heavy packages the
+import pulled in.
+
+    python -m benchmarks.bench_startup --runs 10 --output before.json
+    python -m benchmarks.bench_startup --runs 10 --output after.json --compare before.json
+
+Use `python -X importtime -c "import src.main"` to see where the time goes.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Modules whose presence after `import src.main` is worth knowing about
+WATCHED_MODULES = ["langchain_google_genai", "google.genai", "google.ai.generativelanguage", "grpc", "langsmith"]
+
+PROBE = """
+import json, resource, sys, time
+
+def rss_mb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+result = {"baseline_rss_mb": rss_mb()}
+start = time.perf_counter()
+import src.main
+result["import_s"] = time.perf_counter() - start
+result["import_rss_mb"] = rss_mb()
+result["loaded"] = [name for name in WATCHED if name in sys.modules]
+
+if BUILD_LLM:
+    from src.llm.providers import get_llm
+    start = time.perf_counter()
+    get_llm()
+    result["first_llm_s"] = time.perf_counter() - start
+    result["first_llm_rss_mb"] = rss_mb()
+
+print(json.dumps(result))
+"""
+
+
+def probe(build_llm: bool) -> dict:
+    code = f"WATCHED = {WATCHED_MODULES!r}\nBUILD_LLM = {build_llm!r}\n{PROBE}"
+    env = {**os.environ, "MONGO_ENSURE_INDEXES": "false"}
+    env.setdefault("GOOGLE_API_KEY", "benchmark")   # the Gemini client refuses to build without a key
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def summarize(values: list) -> dict:
+    return {"median": statistics.median(values), "min": min(values), "max": max(values)}
+
+
+def run(runs: int, build_llm: bool) -> dict:
+    samples = [probe(build_llm) for _ in range(runs)]
+    results = {
+        "python": sys.version.split()[0],
+        "llm_provider": os.environ.get("LLM_PROVIDER", "gemini"),
+        "runs": runs,
+        "import_ms": summarize([s["import_s"] * 1e3 for s in samples]),
+        "import_rss_mb": summarize([s["import_rss_mb"] for s in samples]),
+        "baseline_rss_mb": summarize([s["baseline_rss_mb"] for s in samples]),
+        "loaded_modules": samples[-1]["loaded"],
+    }
+    if build_llm:
+        results["first_llm_ms"] = summarize([s["first_llm_s"] * 1e3 for s in samples])
+        results["first_llm_rss_mb"] = summarize([s["first_llm_rss_mb"] for s in samples])
+    return results
+
+
+def print_report(results: dict, baseline: dict = None):
+    def line(label, key, unit):
+        stats = results[key]
+        text = f"{label:<22} median {stats['median']:8.1f} {unit}   min {stats['min']:8.1f}   max {stats['max']:8.1f}"
+        before = (baseline or {}).get(key)
+        if before and before["median"]:
+            text += f"   {(stats['median'] / before['median'] - 1) * 100:+6.1f}%"
+        print(text, file=sys.stderr)
+
+    print(f"{results['runs']} cold imports of src.main (python {results['python']}, provider {results['llm_provider']})", file=sys.stderr)
+    line("import src.main", "import_ms", "ms")
+    line("RSS after import", "import_rss_mb", "MB")
+    if "first_llm_ms" in results:
+        line("first get_llm()", "first_llm_ms", "ms")
+        line("RSS after get_llm()", "first_llm_rss_mb", "MB")
+    print(f"loaded by the import: {', '.join(results['loaded_modules']) or 'none of the watched modules'}", file=sys.stderr)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to time")
+    parser.add_argument("--no-llm", action="store_true", help="only time the import, do not build the model")
+    parser.add_argument("--output", help="write the JSON results here instead of stdout")
+    parser.add_argument("--compare", help="JSON results of an earlier run to diff medians against")
+    args = parser.parse_args()
+
+    results = run(args.runs, build_llm=not args.no_llm)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
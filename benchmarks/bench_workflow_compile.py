@@ -0,0 +1,64 @@
+"""
+Microbenchmark: per-request cost of building and compiling the story graphs.
+
+Compares the old pattern (build + compile a StateGraph on every request, then
+run it) with running the graphs compiled once at import time, the per-request
+history travelling in `config["configurable"]`. Every node runs, but the model
+is the fake provider with no latency and caching is off, so the numbers are the
+graph overhead of a request rather than LLM time.
+
+    python -m benchmarks.bench_workflow_compile [iterations]
+"""
+import asyncio
+import os
+import sys
+import time
+
+# Settings are read when src.config is imported, so pick the benchmark defaults first
+os.environ.setdefault("LLM_PROVIDER", "fake")
+os.environ.setdefault("FAKE_LLM_LATENCY_DISTRIBUTION", "constant")
+os.environ.setdefault("FAKE_LLM_LATENCY_MS", "0")
+os.environ.setdefault("FAKE_LLM_TOKENS_PER_SECOND", "0")
+os.environ.setdefault("LLM_CACHE_ENABLED", "false")
+
+from src.database.models import StoryStateModel
+from src.stories.workflow import (
+    create_workflow,
+    create_continuation_workflow,
+    story_workflow,
+    continuation_workflow,
+    history_config,
+)
+
+PROMPT = "A salvage crew finds a sealed vault beneath a flooded city"
+
+
+async def run_requests(iterations: int, new_story_graph, continuation_graph, story: StoryStateModel) -> float:
+    """Time `iterations` create + continue requests; the graph factories are called per request."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        story_history = [{"role": "user", "content": PROMPT}]
+        await new_story_graph().ainvoke(StoryStateModel(prompt=PROMPT), config=history_config(story_history))
+
+        story_history = [{"role": "user", "content": "continue"}]
+        state = story.model_copy(deep=True, update={"prompt": "continue"})
+        await continuation_graph().ainvoke(state, config=history_config(story_history))
+    return time.perf_counter() - start
+
+
+async def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+
+    # A generated story to continue from, and a warm-up of both graphs
+    story = StoryStateModel(**await story_workflow.ainvoke(StoryStateModel(prompt=PROMPT), config=history_config([])))
+    await run_requests(1, lambda: story_workflow, lambda: continuation_workflow, story)
+
+    before = await run_requests(iterations, create_workflow, create_continuation_workflow, story)
+    after = await run_requests(iterations, lambda: story_workflow, lambda: continuation_workflow, story)
+    print(f"iterations:            {iterations} (create + continue each)")
+    print(f"compile per request:   {before / iterations * 1e3:.3f} ms/request")
+    print(f"compiled once (reuse): {after / iterations * 1e3:.3f} ms/request")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
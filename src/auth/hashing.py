@@ -0,0 +1,41 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from passlib.context import CryptContext
+from src.config import PASSWORD_HASH_WORKERS
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# bcrypt releases the GIL while hashing, so a small thread pool keeps it off the
+# event loop. The pool size caps how many CPU cores a login burst can take.
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+_stats = {"in_flight": 0, "max_in_flight": 0, "completed": 0}
+
+
+async def _run(func, *args):
+    _stats["in_flight"] += 1
+    _stats["max_in_flight"] = max(_stats["max_in_flight"], _stats["in_flight"])
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_executor, func, *args)
+    finally:
+        _stats["in_flight"] -= 1
+        _stats["completed"] += 1
+
+
+async def hash_password(password: str) -> str:
+    return await _run(pwd_context.hash, password)
+
+
+async def verify_password(password: str, hashed_password: str) -> bool:
+    return await _run(pwd_context.verify, password, hashed_password)
+
+
+def hashing_stats() -> dict:
+    """Pool size, queue depth (calls waiting for a worker) and totals."""
+    in_flight = _stats["in_flight"]
+    return {
+        "workers": PASSWORD_HASH_WORKERS,
+        "in_flight": in_flight,
+        "queue_depth": max(0, in_flight - PASSWORD_HASH_WORKERS),
+        "max_in_flight": _stats["max_in_flight"],
+        "completed": _stats["completed"],
+    }
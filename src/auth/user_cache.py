@@ -0,0 +1,26 @@
+from src.auth.models import UserSchema
+from src.cache import LRUCache
+from src.config import USER_CACHE_MAX_ENTRIES, USER_CACHE_TTL_SECONDS
+
+# user_id -> UserSchema (without the password hash) for get_current_user
+user_cache = LRUCache(max_entries=USER_CACHE_MAX_ENTRIES, ttl_seconds=USER_CACHE_TTL_SECONDS)
+
+
+def cache_user(user: UserSchema) -> UserSchema:
+    """Store a copy of `user` without its password hash and return it."""
+    cached = user.model_copy(update={"hashed_password": ""})
+    user_cache.set(user.user_id, cached)
+    return cached
+
+
+def get_cached_user(user_id: str):
+    return user_cache.get(user_id)
+
+
+# Invalidation hooks: call these whenever a user record changes or is removed
+def invalidate_user(user_id: str):
+    user_cache.delete(user_id)
+
+
+def clear_user_cache():
+    user_cache.clear()
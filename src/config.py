@@ -3,8 +3,89 @@ from dotenv import load_dotenv, find_dotenv
 load_dotenv(find_dotenv())
 api_key = os.getenv("GOOGLE_API_KEY")
 MongoDB_url=os.environ.get("MONGODB_URI")
+MONGODB_DB_NAME = os.environ.get("MONGODB_DB_NAME", "interactive_story_generator_db")
 SECRET_KEY = os.environ.get("JWT_SECRET_KEY", "secret")
 ALGORITHM = os.environ.get("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.environ.get("ACCESS_TOKEN_EXPIRE_MINUTES", 60))
 REFRESH_TOKEN_EXPIRE_DAYS = int(os.environ.get("REFRESH_TOKEN_EXPIRE_DAYS", 7))
-REFRESH_SECRET_KEY = os.environ.get("JWT_REFRESH_SECRET_KEY", SECRET_KEY)
\ No newline at end of file
+REFRESH_SECRET_KEY = os.environ.get("JWT_REFRESH_SECRET_KEY", SECRET_KEY)
+
+# LLM response cache
+LLM_CACHE_ENABLED = os.environ.get("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", 1024))
+LLM_CACHE_TTL_SECONDS = int(os.environ.get("LLM_CACHE_TTL_SECONDS", 3600))
+LLM_CACHE_MONGO_ENABLED = os.environ.get("LLM_CACHE_MONGO_ENABLED", "false").lower() == "true"
+
+# Create MongoDB indexes when the app starts
+MONGO_ENSURE_INDEXES = os.environ.get("MONGO_ENSURE_INDEXES", "true").lower() == "true"
+
+# Authenticated user cache; AUTH_STATELESS trusts the signed token claims and skips the user lookup
+USER_CACHE_MAX_ENTRIES = int(os.environ.get("USER_CACHE_MAX_ENTRIES", 10000))
+USER_CACHE_TTL_SECONDS = int(os.environ.get("USER_CACHE_TTL_SECONDS", 300))
+AUTH_STATELESS = os.environ.get("AUTH_STATELESS", "false").lower() == "true"
+
+# bcrypt runs in a dedicated thread pool so it never blocks the event loop
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", 2))
+
+# Asynchronous generation jobs: "memory" (per process) or "mongo" (shared by all workers)
+JOB_QUEUE_BACKEND = os.environ.get("JOB_QUEUE_BACKEND", "memory")
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", 4))
+JOB_POLL_INTERVAL_SECONDS = float(os.environ.get("JOB_POLL_INTERVAL_SECONDS", 0.5))
+# Mongo backend: a running job with no progress update for this long is claimed again
+JOB_LEASE_SECONDS = float(os.environ.get("JOB_LEASE_SECONDS", 300))
+JOB_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", 3))
+
+# Batch story creation
+BATCH_CONCURRENCY = int(os.environ.get("BATCH_CONCURRENCY", 5))
+BATCH_MAX_SIZE = int(os.environ.get("BATCH_MAX_SIZE", 100))
+
+# Character generation: "single" asks for every profile in one completion, "parallel"
+# asks for the cast first and then generates each profile concurrently
+CHARACTER_GENERATION_MODE = os.environ.get("CHARACTER_GENERATION_MODE", "single")
+CHARACTER_PROFILE_RETRIES = int(os.environ.get("CHARACTER_PROFILE_RETRIES", 2))
+
+# LLM provider: "gemini" or "fake" (deterministic local stand-in for load tests and benchmarks)
+LLM_PROVIDER = os.environ.get("LLM_PROVIDER", "gemini")
+LLM_MODEL = os.environ.get("LLM_MODEL", "gemini-2.5-flash-lite")
+# Fake provider: time to first token is drawn from FAKE_LLM_LATENCY_DISTRIBUTION
+# ("constant", "uniform", "normal" or "lognormal") around FAKE_LLM_LATENCY_MS
+FAKE_LLM_LATENCY_DISTRIBUTION = os.environ.get("FAKE_LLM_LATENCY_DISTRIBUTION", "lognormal")
+FAKE_LLM_LATENCY_MS = float(os.environ.get("FAKE_LLM_LATENCY_MS", 500))
+FAKE_LLM_LATENCY_JITTER_MS = float(os.environ.get("FAKE_LLM_LATENCY_JITTER_MS", 150))
+FAKE_LLM_TOKENS_PER_SECOND = float(os.environ.get("FAKE_LLM_TOKENS_PER_SECOND", 200))
+FAKE_LLM_ERROR_RATE = float(os.environ.get("FAKE_LLM_ERROR_RATE", 0))
+FAKE_LLM_ERROR_STATUS = int(os.environ.get("FAKE_LLM_ERROR_STATUS", 503))
+FAKE_LLM_SEED = os.environ.get("FAKE_LLM_SEED")
+
+# LLM scheduler: global cap on concurrent upstream calls, fair across users, with retries on 429/5xx
+LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", 8))
+LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", 3))
+LLM_RETRY_BASE_SECONDS = float(os.environ.get("LLM_RETRY_BASE_SECONDS", 0.5))
+LLM_RETRY_MAX_SECONDS = float(os.environ.get("LLM_RETRY_MAX_SECONDS", 8))
+
+# Rolling summary for continuations: once the unsummarized outline events exceed the
+# budget (estimated tokens), older events and scenes are folded into state.summary after
+# the turn is saved, and prompts send the summary plus the most recent events and scene
+SUMMARY_TOKEN_BUDGET = int(os.environ.get("SUMMARY_TOKEN_BUDGET", 1000))
+SUMMARY_RECENT_EVENTS = int(os.environ.get("SUMMARY_RECENT_EVENTS", 4))
+SUMMARY_RECENT_SCENES = int(os.environ.get("SUMMARY_RECENT_SCENES", 1))
+
+# Continuation router: answer from the local classifier when it is confident, else ask the LLM
+ROUTER_CLASSIFIER_ENABLED = os.environ.get("ROUTER_CLASSIFIER_ENABLED", "true").lower() == "true"
+ROUTER_CLASSIFIER_THRESHOLD = float(os.environ.get("ROUTER_CLASSIFIER_THRESHOLD", 0.6))
+
+# Concurrent continuations of one story: "queue" runs them one after another,
+# "reject" answers 409 while another turn of the story is in progress
+CONTINUE_BUSY_MODE = os.environ.get("CONTINUE_BUSY_MODE", "queue")
+
+# MongoDB client pool; the client is created and pinged at startup and closed on shutdown
+MONGO_MAX_POOL_SIZE = int(os.environ.get("MONGO_MAX_POOL_SIZE", 100))
+MONGO_MIN_POOL_SIZE = int(os.environ.get("MONGO_MIN_POOL_SIZE", 0))
+MONGO_MAX_IDLE_TIME_MS = int(os.environ.get("MONGO_MAX_IDLE_TIME_MS", 300000))
+MONGO_CONNECT_TIMEOUT_MS = int(os.environ.get("MONGO_CONNECT_TIMEOUT_MS", 5000))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000))
+MONGO_PING_ON_STARTUP = os.environ.get("MONGO_PING_ON_STARTUP", "true").lower() == "true"
+
+# Graceful shutdown: running generation jobs get this long to finish before they are
+# cancelled (in-flight HTTP requests are bounded by uvicorn's --timeout-graceful-shutdown)
+SHUTDOWN_DRAIN_TIMEOUT_SECONDS = float(os.environ.get("SHUTDOWN_DRAIN_TIMEOUT_SECONDS", 30))
@@ -1,26 +1,52 @@
 from pymongo import AsyncMongoClient   # Import AsyncMongoClient to connect to MongoDB asynchronously
-from src.config import MongoDB_url
+from src.config import (
+    MongoDB_url,
+    MONGODB_DB_NAME,
+    MONGO_MAX_POOL_SIZE,
+    MONGO_MIN_POOL_SIZE,
+    MONGO_MAX_IDLE_TIME_MS,
+    MONGO_CONNECT_TIMEOUT_MS,
+    MONGO_SERVER_SELECTION_TIMEOUT_MS,
+)
 from loguru import logger
+from src.database.monitoring import mongo_command_metrics
 client=None
 # Define an async function to get a MongoDB database
 async def get_db():
-  db_name="interactive_story_generator_db"
+  db_name=MONGODB_DB_NAME
   global client
   try:
       if not client:
         logger.info("Connecting to MongoDB...")   # Log info before connecting
-        client = AsyncMongoClient(MongoDB_url)    # Create an asynchronous MongoDB client using the connection URL
+        client = AsyncMongoClient(                # Create an asynchronous MongoDB client with the configured pool
+            MongoDB_url,
+            maxPoolSize=MONGO_MAX_POOL_SIZE,
+            minPoolSize=MONGO_MIN_POOL_SIZE,
+            maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+            connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+            serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            event_listeners=[mongo_command_metrics],
+        )
         logger.info(f"Connected to database: {db_name}")
-      db = client[db_name]                      # Get the database with the specified name     
-      return db                   # Return the database object for future used       
+      db = client[db_name]                      # Get the database with the specified name
+      return db                   # Return the database object for future used
   except Exception as e:
         logger.error(f"Failed to connect to MongoDB: {e}")  # Log any errors
         return None
-                    
+
+# Function to open the connection at startup, so the first request does not pay for it
+async def connect_db():
+    db = await get_db()
+    if db is None:
+        raise RuntimeError("Could not create the MongoDB client")
+    await db.command("ping")   # Raises if no server is reachable within the selection timeout
+    logger.info("MongoDB ping succeeded")
+    return db
+
 # Function to close DB connection
-def close_db():
+async def close_db():
     global client
     if client:
-        client.close()
+        await client.close()
         logger.info("MongoDB connection closed")
-        client = None   # Reset client so it can reconnect next time
\ No newline at end of file
+        client = None   # Reset client so it can reconnect next time
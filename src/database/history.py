@@ -0,0 +1,74 @@
+from datetime import datetime, timezone
+from loguru import logger
+from pymongo.errors import DuplicateKeyError
+from src.database.models import StoryTurnModel
+
+HISTORY_COLLECTION = "story_history"
+
+
+# Conversation history is stored as one append-only record per turn, keyed by
+# (story_id, seq), so a turn costs a single insert however long the story is.
+def new_turn(story_id: str, seq: int, messages: list) -> StoryTurnModel:
+    return StoryTurnModel(
+        story_id=story_id,
+        seq=seq,
+        messages=messages,
+        created_at=datetime.now(timezone.utc),
+    )
+
+
+async def append_turn(db, story_id: str, seq: int, messages: list) -> StoryTurnModel:
+    turn = new_turn(story_id, seq, messages)
+    await db[HISTORY_COLLECTION].insert_one(turn.model_dump())
+    return turn
+
+
+async def append_turns(db, turns: list[StoryTurnModel]):
+    """Insert the first turn of many stories at once (batch creation)."""
+    if turns:
+        await db[HISTORY_COLLECTION].insert_many([turn.model_dump() for turn in turns], ordered=False)
+
+
+async def get_turns(db, story_id: str, after_seq: int = -1, limit: int = 20) -> list[dict]:
+    cursor = (
+        db[HISTORY_COLLECTION]
+        .find({"story_id": story_id, "seq": {"$gt": after_seq}}, {"_id": 0})
+        .sort("seq", 1)
+        .limit(limit)
+    )
+    return [turn async for turn in cursor]
+
+
+async def delete_turns(db, story_id: str):
+    await db[HISTORY_COLLECTION].delete_many({"story_id": story_id})
+
+
+async def migrate_legacy_history(db, story_doc: dict) -> int:
+    """Move a story's embedded `history` array (written before turns existed) into turn 0.
+
+    Returns the story's turn count after migration. Safe when two requests migrate
+    the same story at once: a turn 0 already written by the other one is kept, and
+    the story is only updated while it still has no `turns`.
+    """
+    story_id = story_doc["story_id"]
+    legacy = await db["stories"].find_one({"story_id": story_id, "turns": {"$exists": False}}, {"history": 1})
+    if legacy is None:
+        # Already migrated by a concurrent request
+        migrated = await db["stories"].find_one({"story_id": story_id}, {"turns": 1})
+        return (migrated or {}).get("turns", 0)
+
+    messages = legacy.get("history") or []
+    turns = 0
+    if messages:
+        try:
+            await append_turn(db, story_id, 0, messages)
+        except DuplicateKeyError:
+            pass   # turn 0 was written by a concurrent migration
+        turns = 1
+
+    await db["stories"].update_one(
+        {"story_id": story_id, "turns": {"$exists": False}},
+        {"$set": {"turns": turns}, "$unset": {"history": ""}},
+    )
+    logger.info(f"Migrated {len(messages)} history messages for story {story_id}")
+    return turns
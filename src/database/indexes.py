@@ -0,0 +1,119 @@
+"""
+Index management for the stories, story_history, users and jobs collections.
+
+Run at app startup (see src/main.py) or from the command line:
+
+    python -m src.database.indexes            # create indexes
+    python -m src.database.indexes --verify   # create, then explain every route query
+"""
+import asyncio
+import sys
+from datetime import datetime, timezone
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from loguru import logger
+from src.database.history import HISTORY_COLLECTION
+from src.stories.jobs import JOBS_COLLECTION
+
+INDEXES = {
+    "stories": [
+        # get / continue / delete look stories up by {story_id, user_id}
+        IndexModel([("story_id", ASCENDING)], name="story_id_unique", unique=True),
+        # GET /stories lists a user's stories newest first, paginated on (updated_at, story_id)
+        IndexModel(
+            [("user_id", ASCENDING), ("updated_at", DESCENDING), ("story_id", DESCENDING)],
+            name="user_updated_story",
+        ),
+    ],
+    HISTORY_COLLECTION: [
+        IndexModel([("story_id", ASCENDING), ("seq", ASCENDING)], name="story_seq_unique", unique=True),
+    ],
+    "users": [
+        IndexModel([("username", ASCENDING)], name="username_unique", unique=True),
+        IndexModel([("user_id", ASCENDING)], name="user_id_unique", unique=True),
+    ],
+    JOBS_COLLECTION: [
+        IndexModel([("job_id", ASCENDING)], name="job_id_unique", unique=True),
+        # Workers claim the oldest queued job
+        IndexModel([("status", ASCENDING), ("created_at", ASCENDING)], name="status_created"),
+        # ...and running jobs whose lease has expired
+        IndexModel([("status", ASCENDING), ("updated_at", ASCENDING)], name="status_updated"),
+    ],
+}
+
+# One entry per query shape issued by the routes: (collection, filter, sort)
+_SAMPLE_TIME = datetime(2024, 1, 1, tzinfo=timezone.utc)
+ROUTE_QUERIES = {
+    "get/continue/delete story": ("stories", {"story_id": "s", "user_id": "u"}, None),
+    "list stories": ("stories", {"user_id": "u"}, {"updated_at": -1, "story_id": -1}),
+    "list stories (cursor)": (
+        "stories",
+        {
+            "user_id": "u",
+            "$or": [
+                {"updated_at": {"$lt": _SAMPLE_TIME}},
+                {"updated_at": _SAMPLE_TIME, "story_id": {"$lt": "s"}},
+            ],
+        },
+        {"updated_at": -1, "story_id": -1},
+    ),
+    "story history": (HISTORY_COLLECTION, {"story_id": "s", "seq": {"$gt": -1}}, {"seq": 1}),
+    "login / register": ("users", {"username": "name"}, None),
+    "current user": ("users", {"user_id": "u"}, None),
+    "job status": (JOBS_COLLECTION, {"job_id": "j"}, None),
+}
+
+
+async def ensure_indexes(db):
+    """Create every index in INDEXES. Safe to run repeatedly."""
+    for collection, indexes in INDEXES.items():
+        names = await db[collection].create_indexes(indexes)
+        logger.info(f"Indexes ensured on {collection}: {', '.join(names)}")
+
+
+def _plan_stages(plan) -> list[str]:
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(_plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(_plan_stages(item))
+    return stages
+
+
+async def verify_query_plans(db) -> dict:
+    """Explain each route query and report whether its winning plan uses an index.
+
+    Returns {route: [stages]} for every query that does not; empty means all good.
+    """
+    failures = {}
+    for route, (collection, query_filter, sort) in ROUTE_QUERIES.items():
+        find = {"find": collection, "filter": query_filter}
+        if sort:
+            find["sort"] = sort
+        explain = await db.command("explain", find, verbosity="queryPlanner")
+        stages = _plan_stages(explain["queryPlanner"]["winningPlan"])
+        if "COLLSCAN" in stages or not any(stage in ("IXSCAN", "EXPRESS_IXSCAN", "IDHACK") for stage in stages):
+            failures[route] = stages
+            logger.error(f"Query for '{route}' does not use an index: {stages}")
+        else:
+            logger.info(f"Query for '{route}' uses an index: {stages}")
+    return failures
+
+
+async def main(verify: bool = False) -> int:
+    from src.database.connection import get_db
+
+    db = await get_db()
+    if db is None:
+        return 1
+    await ensure_indexes(db)
+    if verify and await verify_query_plans(db):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(verify="--verify" in sys.argv)))
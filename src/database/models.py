@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional,List,Dict
+from typing import Annotated, Optional,List,Dict
 from datetime import datetime
 
 class StoryCreate(BaseModel):
@@ -8,12 +8,24 @@ class StoryCreate(BaseModel):
 class StoryContinue(BaseModel):
     prompt: str
 
+class StoryBatchCreate(BaseModel):
+    stories: List[StoryCreate] = Field(..., min_length=1)
+
+def latest_node(current: Optional[str], update: Optional[str]) -> Optional[str]:
+    # Reducer so parallel continuation branches can each record themselves as current_node
+    return update
+
 # --- Story State (LangGraph checkpoint) ---
 class StoryStateModel(BaseModel):
-    current_node: Optional[str] = "outline_node"
+    current_node: Annotated[Optional[str], latest_node] = "outline_node"
+    actions: List[str] = []  # continuation actions chosen by the router for this turn
     outline: List[str] = []
     characters: List[Dict] = []
     scenes: List[str] = []
+    # Rolling summary of the first `summarized_outline` events and `summarized_scenes` scenes
+    summary: str = ""
+    summarized_outline: int = 0
+    summarized_scenes: int = 0
     # history: List[Dict] = []  # internal workflow messages
     prompt:str
 
@@ -24,10 +36,36 @@ class StoryModel(BaseModel):
     user_id: str  
     prompt: str
     state: StoryStateModel
-    history: List[Dict] = []  # full chat messages [{"role": "user", "content": str}, [{"role": "assistant", "content": str}...]
+    history: List[Dict] = []  # legacy embedded chat messages; new turns live in the story_history collection
+    turns: int = 0  # number of turn records in story_history
+    version: int = 0  # bumped on every write, used for optimistic concurrency
+    full_story: Optional[Dict] = None  # API view of `state`, see src/stories/views.py
     created_at: datetime 
     updated_at: datetime 
 
+# --- Story History Collection (one record per turn) ---
+class StoryTurnModel(BaseModel):
+    story_id: str
+    seq: int
+    messages: List[Dict]  # [{"role": "user", "content": str}, {"role": "assistant", "content": str}...]
+    created_at: datetime
+
+# --- Generation Jobs Collection ---
+class GenerationJobModel(BaseModel):
+    job_id: str
+    kind: str  # "create" or "continue"
+    user_id: str
+    prompt: str
+    payload: Dict = {}  # handler input such as story_id, username and email
+    status: str = "queued"  # queued -> running -> succeeded | failed
+    progress: List[str] = []  # graph nodes finished so far
+    result: Optional[Dict] = None
+    error: Optional[str] = None
+    attempts: int = 0  # claims so far; a claim is retried when its lease expires
+    claimed_at: Optional[datetime] = None
+    created_at: datetime
+    updated_at: datetime
+
 class StoryResponse(BaseModel):
     story_id:str
     user_id: str  
@@ -0,0 +1,43 @@
+"""
+pymongo command listener feeding the Mongo latency metrics in src/metrics.py.
+"""
+from pymongo import monitoring
+from src.metrics import mongo_command_duration, mongo_command_failures
+
+# Handshake and session housekeeping commands are not interesting for latency
+IGNORED_COMMANDS = {"hello", "ismaster", "isMaster", "ping", "endSessions", "saslStart", "saslContinue", "buildInfo"}
+
+# Commands whose first field is not the collection name, and the field that holds it
+COLLECTION_FIELDS = {"getMore": "collection"}
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    def __init__(self):
+        self._pending = {}   # (connection, request_id) -> (collection, command)
+
+    def started(self, event):
+        if event.command_name in IGNORED_COMMANDS:
+            return
+        collection = event.command.get(COLLECTION_FIELDS.get(event.command_name, event.command_name))
+        if event.command_name == "explain":
+            inner = event.command["explain"]
+            collection = next(iter(inner.values()), None) if isinstance(inner, dict) else None
+        label = collection if isinstance(collection, str) else ""
+        self._pending[(event.connection_id, event.request_id)] = (label, event.command_name)
+
+    def _finish(self, event):
+        return self._pending.pop((event.connection_id, event.request_id), None)
+
+    def succeeded(self, event):
+        labels = self._finish(event)
+        if labels:
+            mongo_command_duration.observe(event.duration_micros / 1e6, collection=labels[0], command=labels[1])
+
+    def failed(self, event):
+        labels = self._finish(event)
+        if labels:
+            mongo_command_duration.observe(event.duration_micros / 1e6, collection=labels[0], command=labels[1])
+            mongo_command_failures.inc(collection=labels[0], command=labels[1])
+
+
+mongo_command_metrics = MongoCommandMetrics()
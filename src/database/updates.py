@@ -0,0 +1,61 @@
+from src.database.models import StoryStateModel
+
+
+def _list_delta(path: str, old: list, new: list, set_ops: dict, push_ops: dict):
+    if new == old:
+        return
+    if new[:len(old)] == old:
+        # Only appended items: push them instead of rewriting the list
+        push_ops[path] = {"$each": new[len(old):]}
+    elif len(new) == len(old):
+        # Same length: positional $set for each changed item
+        for idx, (old_item, new_item) in enumerate(zip(old, new)):
+            if old_item != new_item:
+                set_ops[f"{path}.{idx}"] = new_item
+    else:
+        set_ops[path] = new
+
+
+def dict_delta(old_data: dict, new_data: dict, prefix: str) -> dict:
+    """Build a Mongo update document that turns `old_data` (stored under `prefix`) into `new_data`.
+
+    Appended list items become `$push`, in-place list changes become positional `$set`
+    and any other change to a field becomes a `$set` of that field.
+    """
+    set_ops, push_ops = {}, {}
+
+    for field, new_value in new_data.items():
+        old_value = old_data.get(field)
+        path = f"{prefix}.{field}"
+        if isinstance(new_value, list) and isinstance(old_value, list):
+            _list_delta(path, old_value, new_value, set_ops, push_ops)
+        elif new_value != old_value:
+            set_ops[path] = new_value
+
+    update = {}
+    if set_ops:
+        update["$set"] = set_ops
+    if push_ops:
+        update["$push"] = push_ops
+    return update
+
+
+def state_delta(old: StoryStateModel, new: StoryStateModel, prefix: str = "state") -> dict:
+    """Delta update between two story states, touching only changed fields."""
+    return dict_delta(old.model_dump(), new.model_dump(), prefix)
+
+
+def merge_updates(*updates: dict) -> dict:
+    """Combine update documents whose field paths do not overlap."""
+    merged = {}
+    for update in updates:
+        for operator, fields in update.items():
+            merged.setdefault(operator, {}).update(fields)
+    return merged
+
+
+def version_filter(version: int) -> dict:
+    """Match the story version that was loaded; documents written before versioning have none."""
+    if version:
+        return {"version": version}
+    return {"version": {"$exists": False}}
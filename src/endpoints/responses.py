@@ -0,0 +1,33 @@
+"""
+One JSON serializer for API responses and SSE frames.
+
+Uses orjson when it is installed (it ships with langsmith) and the standard
+library otherwise. Routes that return FastJSONResponse skip FastAPI's
+response_model validation, so only pass data that is already trusted.
+"""
+import json
+from datetime import datetime
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:   # pragma: no cover - optional speedup
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, datetime):
+        # Match pydantic's JSON output for UTC datetimes
+        return value.isoformat().replace("+00:00", "Z")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps(content)
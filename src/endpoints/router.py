@@ -1,15 +1,214 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from pymongo.errors import BulkWriteError
 from src.database.connection import get_db
-from src.database.models import StoryModel, StoryCreate, StoryStateModel, StoryContinue,StoryResponse
-from src.stories.workflow import create_workflow, create_continuation_workflow
+from src.auth.models import UserSchema
+from src.database.models import StoryModel, StoryCreate, StoryStateModel, StoryContinue,StoryResponse, StoryBatchCreate
+from src.database.history import append_turn, append_turns, new_turn, get_turns, delete_turns, migrate_legacy_history
+from src.database.updates import state_delta, dict_delta, merge_updates, version_filter
+from src.stories.workflow import story_workflow, continuation_workflow, history_config
+from src.stories.llm_cache import llm_cache
+from src.stories.singleflight import llm_singleflight
+from src.stories.story_locks import LockBusy, story_locks
+from src.stories.jobs import job_pool
+from src.stories.views import full_story_view, story_view
+from src.stories.summary import needs_summary, summarize
+from src.endpoints.responses import FastJSONResponse, dumps
+import asyncio
+import base64
+import hashlib
+import json
 import uuid
+from contextlib import AsyncExitStack
 from loguru import logger
 from src.endpoints.router_auth import get_current_user
+from src.config import BATCH_CONCURRENCY, BATCH_MAX_SIZE, CONTINUE_BUSY_MODE
 from datetime import datetime, timezone
+from typing import Optional
 
 router = APIRouter()
 
 
+# ---------------------------
+# Persistence helpers shared by the plain and streaming routes
+# ---------------------------
+def _build_new_story(current_user, story_id: str, prompt: str, final_state: StoryStateModel) -> dict:
+    """The document for a newly generated story, with its API view precomputed."""
+    now = datetime.now(timezone.utc)
+    new_story = StoryModel(
+        story_id=story_id,
+        user_id=current_user.user_id,
+        prompt=prompt,
+        state=final_state,
+        full_story=full_story_view(final_state),
+        turns=1,
+        version=1,
+        created_at=now,
+        updated_at=now,
+    )
+    return new_story.model_dump(exclude={"history"})
+
+
+async def _save_new_story(db, current_user, story_id: str, prompt: str, final_state: StoryStateModel, story_history: list) -> dict:
+    story_doc = _build_new_story(current_user, story_id, prompt, final_state)
+
+    await db["stories"].insert_one(story_doc)
+    await append_turn(db, story_id, 0, story_history)
+    logger.success(f"New story created with ID: {story_id} for user: {current_user.username}")
+    
+    return story_view(story_doc)
+
+
+async def _save_continuation(db, current_user, story_model: StoryModel, loaded_state: StoryStateModel, updated_state: StoryStateModel, story_history: list) -> dict:
+    # Update story model
+    story_model.state = updated_state
+    story_model.updated_at = datetime.now(timezone.utc)
+
+    # The stored view is updated with the same kind of delta as the state;
+    # stories written before views were stored get theirs set in full
+    full_story = full_story_view(updated_state)
+    if story_model.full_story is not None:
+        view_update = dict_delta(story_model.full_story, full_story, "full_story")
+    else:
+        view_update = {"$set": {"full_story": full_story}}
+    story_model.full_story = full_story
+
+    # Send only what changed since the story was loaded, guarded by its version
+    update = merge_updates(state_delta(loaded_state, updated_state), view_update)
+    update.setdefault("$set", {})["updated_at"] = story_model.updated_at
+    update["$inc"] = {"turns": 1, "version": 1}
+    result = await db["stories"].update_one(
+        {"story_id": story_model.story_id, "user_id": current_user.user_id, **version_filter(story_model.version)},
+        update,
+    )
+    if result.matched_count == 0:
+        logger.error(f"Concurrent update detected for story: {story_model.story_id}")
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Story was modified by another request, please retry")
+
+    # Append this turn's messages as a single record
+    await append_turn(db, story_model.story_id, story_model.turns, story_history)
+    story_model.turns += 1
+    story_model.version += 1
+
+    _schedule_summary(db, story_model)
+    return story_view(vars(story_model))
+
+
+# Summary refreshes run after the response, off the turn's critical path; kept here until done
+_summary_tasks = set()
+
+def _schedule_summary(db, story_model: StoryModel):
+    if not needs_summary(story_model.state):
+        return
+    task = asyncio.create_task(
+        _refresh_summary(db, story_model.story_id, story_model.version, story_model.state.model_copy(deep=True))
+    )
+    _summary_tasks.add(task)
+    task.add_done_callback(_summary_tasks.discard)
+
+async def _refresh_summary(db, story_id: str, version: int, state: StoryStateModel):
+    """Fold older events into the rolling summary so the next turn can use it."""
+    try:
+        fields = await summarize(state)
+        if not fields:
+            return
+        # Written only if no turn was saved meanwhile; that turn schedules its own refresh.
+        # The version filter makes the write safe without the story's lock, which would
+        # make a continuation in "reject" mode answer 409 while no turn is running. The
+        # version is not bumped, and a turn's save leaves the summary fields alone.
+        await db["stories"].update_one(
+            {"story_id": story_id, **version_filter(version)},
+            {"$set": {f"state.{key}": value for key, value in fields.items()}},
+        )
+    except Exception:
+        logger.exception(f"Summary refresh failed for story: {story_id}")
+
+
+async def _load_story_for_continuation(db, current_user, story_id: str, user_input: StoryContinue) -> tuple[StoryModel, StoryStateModel]:
+    # Fetch story (history is stored separately and not needed here)
+    story_doc = await db["stories"].find_one(
+        {"story_id": story_id, "user_id": current_user.user_id}, {"history": 0}
+    )
+    if not story_doc:
+        raise HTTPException(status_code=404, detail="Story not found")
+
+    # Stories written before turn records existed carry their history inline
+    if "turns" not in story_doc:
+        story_doc["turns"] = await migrate_legacy_history(db, story_doc)
+
+    # Load into Pydantic model, keeping an untouched copy of the state to diff against
+    story_model = StoryModel(**story_doc)
+    loaded_state = story_model.state.model_copy(deep=True)
+
+    # Update prompt in state
+    story_model.state.prompt = user_input.prompt
+    return story_model, loaded_state
+
+
+BUSY_DETAIL = "Another continuation of this story is in progress"
+
+
+async def _start_turn(turn: AsyncExitStack, story_id: str):
+    """Take the story's lock on `turn`, held until the stack closes.
+
+    Turns are serialized by `story_locks`: the story is loaded only once the lock
+    is held, so no turn spends LLM calls on a state that is about to change. In
+    "reject" mode a busy story answers 409 instead of waiting; checking and taking
+    the lock is a single step, so two requests cannot both get through.
+    """
+    try:
+        await turn.enter_async_context(story_locks.hold(story_id, wait=CONTINUE_BUSY_MODE != "reject"))
+    except LockBusy:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=BUSY_DETAIL)
+
+
+def _reject_if_busy(story_id: str):
+    """In "reject" mode, refuse to queue a job while a turn of the story is running.
+
+    Advisory only: the job takes the lock when a worker runs it, not now.
+    """
+    if CONTINUE_BUSY_MODE == "reject" and story_locks.locked(story_id):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=BUSY_DETAIL)
+
+
+# ---------------------------
+# Server-sent events
+# ---------------------------
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {dumps(data).decode()}\n\n"
+
+async def _stream_workflow(workflow, state: StoryStateModel, story_history: list, persist):
+    """Run `workflow` and yield SSE frames: one `node` event per finished node,
+    `token` events while scenes are generated, then `done` with the saved story.
+
+    `persist` receives the final state and is awaited once, after the run completes.
+    """
+    final_state_dict = None
+    try:
+        async for mode, chunk in workflow.astream(
+            state,
+            config=history_config(story_history),
+            stream_mode=["updates", "custom", "values"],
+        ):
+            if mode == "custom":
+                yield _sse("token", chunk)
+            elif mode == "updates":
+                for node in chunk:
+                    if not node.startswith("__"):
+                        yield _sse("node", {"node": node})
+            else:
+                final_state_dict = chunk
+
+        yield _sse("done", await persist(StoryStateModel(**final_state_dict)))
+    except HTTPException as e:
+        # e.g. 409 when another turn saved the story first; clients can retry that
+        yield _sse("error", {"status": e.status_code, "detail": e.detail})
+    except Exception:
+        logger.exception("Streaming story generation failed")
+        yield _sse("error", {"status": 500, "detail": "Story generation failed"})
+
+
 # ---------------------------
 # CREATE NEW STORY
 # ---------------------------
@@ -27,66 +226,93 @@ async def create_story(
     # Initialize single story history
     story_history = [{"role": "user", "content": request.prompt}]
 
-    # Create workflow with history wrapped nodes
-    workflow = create_workflow(story_history)
-
-    # Run workflow
-    final_state_dict = await workflow.ainvoke(initial_state)
+    # Run the shared workflow, passing this story's history in the config
+    final_state_dict = await story_workflow.ainvoke(initial_state, config=history_config(story_history))
     final_state = StoryStateModel(**final_state_dict)
 
-    # ✅ Build structured story step by step 
-    structured_story = {}
-
-    # Outline
-    outline_list = []
-    for point in final_state.outline:
-        outline_list.append(point)
-    structured_story["outline"] = outline_list
-
-    # Characters
-    characters_list = []
-    for c in final_state.characters:
-        character = {
-            "name": c.get("name", "Unknown"),
-            "background": c.get("background", "No background available."),
-            "motivations": c.get("motivations", "No motivations specified."),
-            "role": c.get("role", "No role specified."),
-        }
-        characters_list.append(character)
-    structured_story["characters"] = characters_list
-
-    # Scenes
-    scenes_list = []
-    for idx, scene in enumerate(final_state.scenes, start=1):
-        scenes_list.append({
-            "scene_number": idx,
-            "content": scene
-        })
-    structured_story["scenes"] = scenes_list
-
-    # Save story
-    new_story = StoryModel(
-        story_id=story_id,
-        user_id=current_user.user_id,
-        prompt=request.prompt,
-        state=final_state,
-        history=story_history,
-        created_at=datetime.now(timezone.utc),
-        updated_at=datetime.now(timezone.utc),
-    )
+    story = await _save_new_story(db, current_user, story_id, request.prompt, final_state, story_history)
+    return FastJSONResponse(story)
+
+
+@router.post("/new/stream")
+async def create_story_stream(
+    request: StoryCreate,
+    db=Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    story_id = str(uuid.uuid4())
+    initial_state = StoryStateModel(prompt=request.prompt)
+    story_history = [{"role": "user", "content": request.prompt}]
+
+    async def persist(final_state: StoryStateModel) -> dict:
+        return await _save_new_story(db, current_user, story_id, request.prompt, final_state, story_history)
 
-    new_story_api = StoryResponse(
-        story_id=new_story.story_id,
-        user_id=new_story.user_id,
-        full_story=structured_story,   # ✅ structured JSON (no full text)
-        created_at=new_story.created_at,
-        updated_at=new_story.updated_at,
+    return StreamingResponse(
+        _stream_workflow(story_workflow, initial_state, story_history, persist),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
-    await db["stories"].insert_one(new_story.model_dump())
-    logger.success(f"New story created with ID: {story_id} for user: {current_user.username}")
-    
-    return new_story_api
+
+
+# ---------------------------
+# BATCH CREATE STORIES
+# ---------------------------
+@router.post("/batch")
+async def create_stories_batch(
+    request: StoryBatchCreate,
+    db=Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    if len(request.stories) > BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A batch can contain at most {BATCH_MAX_SIZE} stories",
+        )
+
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def generate(item: StoryCreate):
+        async with semaphore:
+            story_history = [{"role": "user", "content": item.prompt}]
+            final_state_dict = await story_workflow.ainvoke(
+                StoryStateModel(prompt=item.prompt), config=history_config(story_history)
+            )
+            return StoryStateModel(**final_state_dict), story_history
+
+    # One failed generation must not abort the rest of the batch
+    outcomes = await asyncio.gather(*(generate(item) for item in request.stories), return_exceptions=True)
+
+    results = []
+    new_stories, turns, created = [], [], {}
+    for index, (item, outcome) in enumerate(zip(request.stories, outcomes)):
+        if isinstance(outcome, Exception):
+            logger.error(f"Batch item {index} failed: {outcome}")
+            results.append({"index": index, "status": "failed", "error": str(outcome) or type(outcome).__name__})
+            continue
+
+        final_state, story_history = outcome
+        story_id = str(uuid.uuid4())
+        story_doc = _build_new_story(current_user, story_id, item.prompt, final_state)
+        created[len(new_stories)] = index
+        new_stories.append(story_doc)
+        turns.append(new_turn(story_id, 0, story_history))
+        results.append({"index": index, "status": "created", "story": story_view(story_doc)})
+
+    # Persist every generated story with a single insert_many
+    if new_stories:
+        try:
+            await db["stories"].insert_many(new_stories, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                index = created[error["index"]]
+                results[index] = {"index": index, "status": "failed", "error": error.get("errmsg", "Write failed")}
+        saved = {result["story"]["story_id"] for result in results if result["status"] == "created"}
+        await append_turns(db, [turn for turn in turns if turn.story_id in saved])
+
+    succeeded = sum(1 for result in results if result["status"] == "created")
+    logger.success(f"Batch created {succeeded}/{len(results)} stories for user: {current_user.username}")
+    return FastJSONResponse({"created": succeeded, "failed": len(results) - succeeded, "results": results})
 
 
 
@@ -100,188 +326,394 @@ async def continue_story(
     db=Depends(get_db),
     current_user=Depends(get_current_user),
 ):
-    # Fetch story
-    story_doc = await db["stories"].find_one(
-        {"story_id": story_id, "user_id": current_user.user_id}
+    async with AsyncExitStack() as turn:
+        await _start_turn(turn, story_id)
+        story_model, loaded_state = await _load_story_for_continuation(db, current_user, story_id, user_input)
+
+        # History for this turn only; it is appended as a single record
+        story_history = [{"role": "user", "content": user_input.prompt}]
+
+        # Run the shared continuation workflow with this turn's history
+        updated_state_dict = await continuation_workflow.ainvoke(
+            story_model.state, config=history_config(story_history)
+        )
+        updated_state = StoryStateModel(**updated_state_dict)
+
+        story = await _save_continuation(db, current_user, story_model, loaded_state, updated_state, story_history)
+    return FastJSONResponse(story)
+
+
+@router.post("/{story_id}/continue/stream")
+async def continue_story_stream(
+    story_id: str,
+    user_input: StoryContinue,
+    db=Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    # Fail fast with 404 or 409 before the stream starts
+    story = await db["stories"].find_one(
+        {"story_id": story_id, "user_id": current_user.user_id}, {"_id": 1}
     )
-    if not story_doc:
+    if not story:
         raise HTTPException(status_code=404, detail="Story not found")
+    story_history = [{"role": "user", "content": user_input.prompt}]
+
+    # In "reject" mode the lock is taken before the response starts, so a busy story
+    # gets a real 409; in "queue" mode the stream starts and waits for its turn.
+    # Either way it is held until the turn is saved, and released after the response
+    # even if the stream never ran.
+    turn = AsyncExitStack()
+    if CONTINUE_BUSY_MODE == "reject":
+        await _start_turn(turn, story_id)
+
+    async def events():
+        async with turn:
+            if CONTINUE_BUSY_MODE != "reject":
+                await _start_turn(turn, story_id)
+            try:
+                story_model, loaded_state = await _load_story_for_continuation(db, current_user, story_id, user_input)
+            except HTTPException as e:
+                yield _sse("error", {"status": e.status_code, "detail": e.detail})
+                return
+
+            async def persist(updated_state: StoryStateModel) -> dict:
+                return await _save_continuation(db, current_user, story_model, loaded_state, updated_state, story_history)
+
+            async for frame in _stream_workflow(continuation_workflow, story_model.state, story_history, persist):
+                yield frame
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(turn.aclose),
+    )
 
-    # Load into Pydantic model
-    story_model = StoryModel(**story_doc)
 
-    # Append user input to history
-    story_model.history.append({"role": "user", "content": user_input.prompt})
 
-    # Update prompt in state
-    story_model.state.prompt = user_input.prompt
-
-    # Create continuation workflow with history
-    workflow = create_continuation_workflow(story_model.history)
+# ---------------------------
+# ASYNC GENERATION JOBS
+# ---------------------------
+async def _run_with_progress(workflow, state: StoryStateModel, story_history: list, report_progress) -> StoryStateModel:
+    final_state_dict = None
+    async for mode, chunk in workflow.astream(
+        state,
+        config=history_config(story_history),
+        stream_mode=["updates", "values"],
+    ):
+        if mode == "updates":
+            for node in chunk:
+                if not node.startswith("__"):
+                    await report_progress(node)
+        else:
+            final_state_dict = chunk
+    return StoryStateModel(**final_state_dict)
+
+def _job_user(job) -> UserSchema:
+    return UserSchema(
+        user_id=job.user_id,
+        username=job.payload["username"],
+        email=job.payload["email"],
+        hashed_password="",
+    )
 
-    # Run workflow
-    updated_state_dict = await workflow.ainvoke(story_model.state)
-    updated_state = StoryStateModel(**updated_state_dict)
+async def _create_story_job(job, report_progress) -> dict:
+    db = await get_db()
+    story_history = [{"role": "user", "content": job.prompt}]
+    final_state = await _run_with_progress(
+        story_workflow, StoryStateModel(prompt=job.prompt), story_history, report_progress
+    )
+    return await _save_new_story(db, _job_user(job), job.payload["story_id"], job.prompt, final_state, story_history)
+
+async def _continue_story_job(job, report_progress) -> dict:
+    db = await get_db()
+    current_user = _job_user(job)
+    # Jobs always wait their turn; "reject" mode is applied when the job is submitted
+    async with story_locks.hold(job.payload["story_id"]):
+        story_model, loaded_state = await _load_story_for_continuation(
+            db, current_user, job.payload["story_id"], StoryContinue(prompt=job.prompt)
+        )
+        story_history = [{"role": "user", "content": job.prompt}]
+        updated_state = await _run_with_progress(continuation_workflow, story_model.state, story_history, report_progress)
+        return await _save_continuation(db, current_user, story_model, loaded_state, updated_state, story_history)
+
+job_pool.register("create", _create_story_job)
+job_pool.register("continue", _continue_story_job)
+
+def _job_accepted(job) -> dict:
+    return {
+        "job_id": job.job_id,
+        "status": job.status,
+        "story_id": job.payload["story_id"],
+        "status_url": f"/stories/jobs/{job.job_id}",
+    }
+
+@router.post("/jobs/new", status_code=status.HTTP_202_ACCEPTED)
+async def create_story_job(
+    request: StoryCreate,
+    current_user=Depends(get_current_user),
+):
+    job = await job_pool.submit(
+        "create",
+        current_user.user_id,
+        request.prompt,
+        story_id=str(uuid.uuid4()),
+        username=current_user.username,
+        email=current_user.email,
+    )
+    return _job_accepted(job)
 
-    # Update story model
-    story_model.state = updated_state
-    story_model.updated_at = datetime.now(timezone.utc)
 
-    # Persist updated state & history
-    await db["stories"].update_one(
-        {"story_id": story_id, "user_id": current_user.user_id},
-        {
-            "$set": {
-                "state": story_model.state.model_dump(),
-                "history": story_model.history,
-                "updated_at": story_model.updated_at,
-            }
-        },
+@router.post("/jobs/{story_id}/continue", status_code=status.HTTP_202_ACCEPTED)
+async def continue_story_job(
+    story_id: str,
+    user_input: StoryContinue,
+    db=Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    story = await db["stories"].find_one(
+        {"story_id": story_id, "user_id": current_user.user_id}, {"_id": 1}
     )
+    if not story:
+        raise HTTPException(status_code=404, detail="Story not found")
+    _reject_if_busy(story_id)
 
-    # Build structured JSON response
-    structured_story = {}
-
-    # Outline
-    outline_list = []
-    for point in updated_state.outline:
-        outline_list.append(point)
-    structured_story["outline"] = outline_list
-
-    # Characters
-    characters_list = []
-    for c in updated_state.characters:
-        character = {
-            "name": c.get("name", "Unknown"),
-            "background": c.get("background", "No background available."),
-            "motivations": c.get("motivations", "No motivations specified."),
-            "role": c.get("role", "No role specified."),
-        }
-        characters_list.append(character)
-    structured_story["characters"] = characters_list
-
-    # Scenes
-    scenes_list = []
-    for idx, scene in enumerate(updated_state.scenes, start=1):
-        scenes_list.append({
-            "scene_number": idx,
-            "content": scene
-        })
-    structured_story["scenes"] = scenes_list
-
-    return StoryResponse(
-        story_id=story_model.story_id,
-        user_id=story_model.user_id,
-        full_story=structured_story,
-        created_at=story_model.created_at,
-        updated_at=story_model.updated_at,
+    job = await job_pool.submit(
+        "continue",
+        current_user.user_id,
+        user_input.prompt,
+        story_id=story_id,
+        username=current_user.username,
+        email=current_user.email,
     )
+    return _job_accepted(job)
+
+
+@router.get("/jobs/{job_id}")
+async def get_story_job(
+    job_id: str,
+    current_user=Depends(get_current_user),
+):
+    job = await job_pool.queue.get(job_id)
+    if not job or job.user_id != current_user.user_id:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return {
+        "job_id": job.job_id,
+        "kind": job.kind,
+        "story_id": job.payload["story_id"],
+        "status": job.status,
+        "progress": job.progress,
+        "result": job.result,
+        "error": job.error,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at,
+    }
+
+
+
+# ---------------------------
+# CONDITIONAL READS (ETag / If-None-Match)
+# ---------------------------
+# Stories are per user and change on every turn: clients may keep a copy but must revalidate it
+STORY_CACHE_CONTROL = "private, no-cache"
+VERSION_PROJECTION = {"_id": 0, "story_id": 1, "version": 1, "updated_at": 1}
+
+def _etag(*parts) -> str:
+    """Strong ETag over the version fields of one or more stories."""
+    raw = json.dumps(parts, default=str, separators=(",", ":"))
+    return '"' + hashlib.sha256(raw.encode()).hexdigest()[:32] + '"'
+
+def _story_etag(story_doc: dict) -> str:
+    return _etag(story_doc["story_id"], story_doc.get("version", 0), story_doc["updated_at"])
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    # If-None-Match uses the weak comparison, so a W/ prefix is ignored
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": STORY_CACHE_CONTROL})
 
 
 
 # ---------------------------
 # GET ALL STORIES
 # ---------------------------
+# Reads serve the stored view, so neither the state nor the unbounded history array is fetched
+LIST_PROJECTION = {"_id": 0, "history": 0, "state": 0}
+
+async def _with_full_story(db, story_docs: list) -> list:
+    """Fill in `full_story` for stories written before views were stored, and save it for next time."""
+    missing = [doc["story_id"] for doc in story_docs if doc.get("full_story") is None]
+    if not missing:
+        return story_docs
+
+    states = {
+        doc["story_id"]: doc.get("state") or {}
+        async for doc in db["stories"].find({"story_id": {"$in": missing}}, {"_id": 0, "story_id": 1, "state": 1})
+    }
+    for doc in story_docs:
+        if doc.get("full_story") is None:
+            doc["full_story"] = full_story_view(states.get(doc["story_id"], {}))
+            # Only if still missing: a concurrent continuation may have just written a newer view
+            await db["stories"].update_one(
+                {"story_id": doc["story_id"], "full_story": None}, {"$set": {"full_story": doc["full_story"]}}
+            )
+    return story_docs
+
+def _encode_cursor(updated_at: datetime, story_id: str) -> str:
+    raw = json.dumps({"u": updated_at.isoformat(), "s": story_id})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def _decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        return datetime.fromisoformat(data["u"]), data["s"]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+def _list_query(user_id: str, cursor: Optional[str]) -> dict:
+    query = {"user_id": user_id}
+    if cursor:
+        # Keyset pagination on (updated_at, story_id), newest first
+        updated_at, story_id = _decode_cursor(cursor)
+        query["$or"] = [
+            {"updated_at": {"$lt": updated_at}},
+            {"updated_at": updated_at, "story_id": {"$lt": story_id}},
+        ]
+    return query
+
 @router.get("/", response_model=list[dict])
 async def get_all_stories(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    summary: bool = False,
+    if_none_match: Optional[str] = Header(None),
     db=Depends(get_db),
     current_user=Depends(get_current_user),
 ):
-    stories_cursor = db["stories"].find({"user_id": current_user.user_id})
-    stories_list = []
-    story_number = 1
-
-    async for story_doc in stories_cursor:
-        story_model = StoryModel(**story_doc)
-
-        # Build structured story
-        structured_story = {
-            "outline": story_model.state.outline or [],
-            "characters": [
-                {
-                    "name": c.get("name", "Unknown"),
-                    "background": c.get("background", "No background available."),
-                    "motivations": c.get("motivations", "No motivations specified."),
-                    "role": c.get("role", "No role specified."),
-                } for c in story_model.state.characters
-            ],
-            "scenes": [
-                {"scene_number": idx + 1, "content": scene} 
-                for idx, scene in enumerate(story_model.state.scenes or [])
-            ],
-        }
-
-        # Append story with a number for clear separation
-        stories_list.append({
-            "story_number": story_number,
-            "story_id": story_model.story_id,
-            "user_id": story_model.user_id,
-            "full_story": structured_story,
-            "created_at": story_model.created_at,
-            "updated_at": story_model.updated_at,
-        })
-
-        story_number += 1
+    query = _list_query(current_user.user_id, cursor)
+    sort = [("updated_at", -1), ("story_id", -1)]
+
+    def page_etag(version_docs: list) -> str:
+        versions = [(doc["story_id"], doc.get("version", 0), doc["updated_at"]) for doc in version_docs]
+        return _etag(current_user.user_id, limit, cursor, summary, versions)
+
+    if if_none_match:
+        # Revalidate against the page's version fields only (limit + 1 also covers the next cursor)
+        version_cursor = db["stories"].find(query, VERSION_PROJECTION).sort(sort).limit(limit + 1)
+        etag = page_etag([doc async for doc in version_cursor])
+        if _etag_matches(if_none_match, etag):
+            return _not_modified(etag)
+
+    if summary:
+        # Counts are computed server side so outline/characters/scenes are never sent
+        stories_cursor = await db["stories"].aggregate([
+            {"$match": query},
+            {"$sort": dict(sort)},
+            {"$limit": limit + 1},
+            {"$project": {
+                "_id": 0,
+                "story_id": 1,
+                "user_id": 1,
+                "prompt": 1,
+                "outline_count": {"$size": {"$ifNull": ["$state.outline", []]}},
+                "characters_count": {"$size": {"$ifNull": ["$state.characters", []]}},
+                "scenes_count": {"$size": {"$ifNull": ["$state.scenes", []]}},
+                "version": 1,
+                "created_at": 1,
+                "updated_at": 1,
+            }},
+        ])
+    else:
+        stories_cursor = db["stories"].find(query, LIST_PROJECTION).sort(sort).limit(limit + 1)
+
+    story_docs = [story_doc async for story_doc in stories_cursor]
+    headers = {"ETag": page_etag(story_docs), "Cache-Control": STORY_CACHE_CONTROL}
+    if len(story_docs) > limit:
+        story_docs = story_docs[:limit]
+        last = story_docs[-1]
+        headers["X-Next-Cursor"] = _encode_cursor(last["updated_at"], last["story_id"])
+
+    if summary:
+        stories_list = [{"story_number": story_number, **story_doc} for story_number, story_doc in enumerate(story_docs, start=1)]
+    else:
+        story_docs = await _with_full_story(db, story_docs)
+        # Number the stories for clear separation
+        stories_list = [{"story_number": story_number, **story_view(story_doc)} for story_number, story_doc in enumerate(story_docs, start=1)]
 
     logger.success(f"{len(stories_list)} stories fetched for user: {current_user.username} with id :{current_user.user_id}")
-    return stories_list
+    return FastJSONResponse(stories_list, headers=headers)
 
 
 
 # ---------------------------
-# GET STORY BY ID
+# LLM CACHE STATS
 # ---------------------------
-@router.get("/{story_id}", response_model=StoryResponse)
-async def get_story(
+@router.get("/cache/stats")
+async def get_llm_cache_stats(current_user=Depends(get_current_user)):
+    return {**llm_cache.stats(), "single_flight": llm_singleflight.stats()}
+
+
+
+# ---------------------------
+# GET STORY HISTORY (paginated by turn)
+# ---------------------------
+@router.get("/{story_id}/history")
+async def get_story_history(
     story_id: str,
+    after: int = Query(-1, ge=-1, description="Return turns with seq greater than this"),
+    limit: int = Query(20, ge=1, le=100),
     db=Depends(get_db),
     current_user=Depends(get_current_user),
 ):
     story_doc = await db["stories"].find_one(
-        {"story_id": story_id, "user_id": current_user.user_id}
+        {"story_id": story_id, "user_id": current_user.user_id}, {"_id": 0, "story_id": 1, "turns": 1}
     )
     if not story_doc:
         raise HTTPException(status_code=404, detail="Story not found")
 
-    story_model = StoryModel(**story_doc)
+    if "turns" not in story_doc:
+        await migrate_legacy_history(db, story_doc)
+
+    turns = await get_turns(db, story_id, after_seq=after, limit=limit)
+    next_after = turns[-1]["seq"] if len(turns) == limit else None
+    return {"story_id": story_id, "turns": turns, "next_after": next_after}
+
 
-    # Build structured story
-    structured_story = {}
-
-    # Outline
-    outline_list = []
-    for point in story_model.state.outline:
-        outline_list.append(point)
-    structured_story["outline"] = outline_list
-
-    # Characters
-    characters_list = []
-    for c in story_model.state.characters:
-        character = {
-            "name": c.get("name", "Unknown"),
-            "background": c.get("background", "No background available."),
-            "motivations": c.get("motivations", "No motivations specified."),
-            "role": c.get("role", "No role specified."),
-        }
-        characters_list.append(character)
-    structured_story["characters"] = characters_list
-
-    # Scenes
-    scenes_list = []
-    for idx, scene in enumerate(story_model.state.scenes, start=1):
-        scenes_list.append({
-            "scene_number": idx,
-            "content": scene
-        })
-    structured_story["scenes"] = scenes_list
+
+# ---------------------------
+# GET STORY BY ID
+# ---------------------------
+@router.get("/{story_id}", response_model=StoryResponse)
+async def get_story(
+    story_id: str,
+    if_none_match: Optional[str] = Header(None),
+    db=Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    story_filter = {"story_id": story_id, "user_id": current_user.user_id}
+    if if_none_match:
+        # Only the version fields are fetched to revalidate the client's copy
+        version_doc = await db["stories"].find_one(story_filter, VERSION_PROJECTION)
+        if not version_doc:
+            raise HTTPException(status_code=404, detail="Story not found")
+        etag = _story_etag(version_doc)
+        if _etag_matches(if_none_match, etag):
+            return _not_modified(etag)
+
+    story_doc = await db["stories"].find_one(story_filter, LIST_PROJECTION)
+    if not story_doc:
+        raise HTTPException(status_code=404, detail="Story not found")
+
+    await _with_full_story(db, [story_doc])
     logger.success(f"Story fetched: {story_id} for user: {current_user.username} with id :{current_user.user_id}")
-    return StoryResponse(
-        story_id=story_model.story_id,
-        user_id=story_model.user_id,
-        full_story=structured_story,
-        created_at=story_model.created_at,
-        updated_at=story_model.updated_at,
-    )
+    headers = {"ETag": _story_etag(story_doc), "Cache-Control": STORY_CACHE_CONTROL}
+    return FastJSONResponse(story_view(story_doc), headers=headers)
 
 # ---------------------------
 # DELETE STORY
@@ -293,11 +725,12 @@ async def delete_story(
     current_user=Depends(get_current_user),
 ):
     story = await db["stories"].find_one(
-        {"story_id": story_id, "user_id": current_user.user_id}
+        {"story_id": story_id, "user_id": current_user.user_id}, {"_id": 1}
     )
     if not story:
         raise HTTPException(status_code=404, detail="Story not found")
     
     await db["stories"].delete_one({"story_id": story_id, "user_id": current_user.user_id})
+    await delete_turns(db, story_id)
     logger.success(f"Story deleted: {story_id} for user: {current_user.username} with id {current_user.user_id}")
     return {"message": f"Story {story_id} deleted successfully"}
@@ -1,15 +1,16 @@
 from datetime import datetime, timedelta, timezone
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from passlib.context import CryptContext
 from jose import jwt, JWTError
 from loguru import logger
 import uuid
 from src.database.connection import get_db
 from src.auth.models import UserSchema, UserCreate
-from src.config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_DAYS, REFRESH_SECRET_KEY
+from src.auth.hashing import hash_password, verify_password
+from src.auth.user_cache import cache_user, get_cached_user
+from src.llm.scheduler import llm_user_id
+from src.config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_DAYS, REFRESH_SECRET_KEY, AUTH_STATELESS
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 router = APIRouter()
@@ -49,7 +50,7 @@ async def authenticate_user(db, username: str, password: str):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate user")
 
     user_doc = UserSchema(**user)
-    if not pwd_context.verify(password, user_doc.hashed_password):
+    if not await verify_password(password, user_doc.hashed_password):
         logger.error(f"Authentication failed: incorrect password for '{username}'")
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect username or password")
 
@@ -63,6 +64,19 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db=Depends(get_d
         if not user_id:
             logger.error("Token missing user_id")
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+        llm_user_id.set(user_id)   # LLM calls made for this request are queued under this user
+
+        if AUTH_STATELESS:
+            # Trust the signed claims instead of looking the user up
+            username, email = payload.get("username"), payload.get("email")
+            if not username or not email:
+                logger.error("Token missing username/email claims")
+                raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+            return UserSchema(user_id=user_id, username=username, email=email, hashed_password="")
+
+        cached = get_cached_user(user_id)
+        if cached is not None:
+            return cached
 
         user = await db["users"].find_one({"user_id": user_id})
         if not user:
@@ -70,7 +84,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db=Depends(get_d
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate user")
 
         logger.debug(f"Token validated for user: {user['username']}")
-        return UserSchema(**user)
+        return cache_user(UserSchema(**user))
     except JWTError:
         logger.exception("JWT decode error")
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
@@ -86,7 +100,7 @@ async def register(user: UserCreate, db=Depends(get_db)):
         logger.error(f"User already exists: {user.username}")
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="User already exists")
 
-    hashed_pw = pwd_context.hash(user.password)
+    hashed_pw = await hash_password(user.password)
     user_doc = UserSchema(
         user_id=str(uuid.uuid4()),
         username=user.username,
@@ -0,0 +1,50 @@
+"""
+Graceful shutdown hook.
+
+On SIGTERM/SIGINT, uvicorn stops accepting connections and waits for in-flight
+HTTP requests (streams included) before it runs the lifespan shutdown. That wait
+is bounded only by uvicorn's `--timeout-graceful-shutdown`, so run it with one,
+for example:
+
+    uvicorn src.main:app --timeout-graceful-shutdown 30
+
+Work that does not come from HTTP, such as the job workers, has to stop taking
+new work as soon as the signal arrives, not after that wait. `on_shutdown_signal`
+chains a callback in front of the server's own signal handler for that.
+"""
+import asyncio
+import signal
+
+SHUTDOWN_SIGNALS = (signal.SIGTERM, signal.SIGINT)
+
+
+def on_shutdown_signal(callback):
+    """Run `callback()` on the event loop when a shutdown signal arrives.
+
+    The previous handler (the server's) still runs. Returns a function that
+    restores it. Outside the main thread, or when no server has installed a
+    handler, nothing is hooked.
+    """
+    loop = asyncio.get_running_loop()
+    previous_handlers = {}
+
+    for sig in SHUTDOWN_SIGNALS:
+        previous = signal.getsignal(sig)
+        if not callable(previous) or previous is signal.default_int_handler:
+            continue
+
+        def handler(signum, frame, previous=previous):
+            loop.call_soon_threadsafe(callback)
+            previous(signum, frame)
+
+        try:
+            signal.signal(sig, handler)
+        except ValueError:   # not the main thread, e.g. under a test client
+            break
+        previous_handlers[sig] = previous
+
+    def restore():
+        for sig, previous in previous_handlers.items():
+            signal.signal(sig, previous)
+
+    return restore
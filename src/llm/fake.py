@@ -0,0 +1,148 @@
+"""
+Deterministic local stand-in for the chat model, used for offline load tests and
+benchmarks (LLM_PROVIDER=fake).
+
+Replies depend only on the prompt, so runs are repeatable; only latency and
+injected errors are random (seed them with FAKE_LLM_SEED).
+"""
+import asyncio
+import json
+import math
+import random
+import re
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+CANNED_CHARACTERS = [
+    {
+        "name": "Mara Voss",
+        "background": "A salvage pilot who grew up on the edge of the old city.",
+        "motivations": "Wants to pay off her family's debt and find her missing brother.",
+        "role": "Protagonist",
+    },
+    {
+        "name": "Ilan Reyes",
+        "background": "A disgraced archivist who still keeps the city's forbidden maps.",
+        "motivations": "Seeks to restore his name by uncovering the truth.",
+        "role": "Mentor",
+    },
+    {
+        "name": "The Warden",
+        "background": "The masked enforcer of the council that rules the districts.",
+        "motivations": "Keeps order at any cost and hides what lies beneath the city.",
+        "role": "Antagonist",
+    },
+]
+
+OUTLINE_TEXT = "\n".join([
+    "1. A routine salvage run uncovers a sealed vault beneath the flooded district.",
+    "2. The crew is hunted after the vault's contents are traced back to them.",
+    "3. An old ally reveals the vault belongs to the council that rules the city.",
+    "4. The crew must choose between selling the secret and exposing it.",
+])
+
+SCENE_TEXT = (
+    "Rain hammered the rusted roofs of the flooded district as Mara guided the skiff "
+    "between the drowned towers. Her lamp caught the edge of something that should not "
+    "have been there: a door of polished steel, untouched by decades of water. Ilan leaned "
+    "over the bow, his breath fogging in the cold air. \"That seal is council work,\" he "
+    "whispered. Somewhere above them, a searchlight swept across the water, and a siren "
+    "began to wail."
+)
+
+SUMMARY_TEXT = (
+    "Mara and Ilan found a council vault beneath the flooded district and are now hunted "
+    "by the Warden, while Ilan's old maps hint at what the council is hiding."
+)
+
+
+class FakeLLMError(Exception):
+    """Raised for injected failures; `status_code` mimics an upstream HTTP error."""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"Fake LLM injected error (HTTP {status_code})")
+        self.status_code = status_code
+
+
+def canned_reply(prompt_text: str) -> str:
+    """Pick a reply shaped like what the node that sent `prompt_text` expects."""
+    if "action keyword" in prompt_text:
+        return "append_scene"
+    if prompt_text.startswith("Update the running summary"):
+        return SUMMARY_TEXT
+    if prompt_text.startswith("Develop the character"):
+        return "Grows warier of the council and more protective of the crew."
+    profile = re.search(r'Write the profile of the character "([^"]+)"', prompt_text)
+    if profile:
+        name = profile.group(1)
+        base = next((c for c in CANNED_CHARACTERS if c["name"] == name), CANNED_CHARACTERS[0])
+        return json.dumps({**base, "name": name})
+    if "List the 2–4 main characters" in prompt_text:
+        return json.dumps([{"name": c["name"], "role": c["role"]} for c in CANNED_CHARACTERS])
+    if "JSON list" in prompt_text:
+        return json.dumps(CANNED_CHARACTERS)
+    if "outline" in prompt_text.lower() and "scene" not in prompt_text.lower():
+        return OUTLINE_TEXT
+    return SCENE_TEXT
+
+
+class FakeChatModel:
+    """Implements the `ainvoke` / `astream` surface the nodes use."""
+
+    def __init__(
+        self,
+        latency_distribution: str = "lognormal",
+        latency_ms: float = 500,
+        latency_jitter_ms: float = 150,
+        tokens_per_second: float = 200,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        seed=None,
+    ):
+        self.model = "fake"
+        self.latency_distribution = latency_distribution
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._random = random.Random(seed)
+
+    def first_token_delay(self) -> float:
+        mean, jitter = self.latency_ms, self.latency_jitter_ms
+        if self.latency_distribution == "constant" or jitter <= 0:
+            delay = mean
+        elif self.latency_distribution == "uniform":
+            delay = self._random.uniform(mean - jitter, mean + jitter)
+        elif self.latency_distribution == "normal":
+            delay = self._random.gauss(mean, jitter)
+        elif self.latency_distribution == "lognormal":
+            # Parameters chosen so the distribution has the configured mean and stddev
+            variance = jitter ** 2
+            sigma2 = math.log(1 + variance / mean ** 2)
+            mu = math.log(mean) - sigma2 / 2
+            delay = self._random.lognormvariate(mu, sigma2 ** 0.5)
+        else:
+            raise ValueError(f"Unknown latency distribution: {self.latency_distribution}")
+        return max(delay, 0) / 1000
+
+    def _maybe_fail(self):
+        if self.error_rate and self._random.random() < self.error_rate:
+            raise FakeLLMError(self.error_status)
+
+    @staticmethod
+    def _prompt_text(messages) -> str:
+        return "\n".join(m["content"] if isinstance(m, dict) else m.content for m in messages)
+
+    async def astream(self, messages):
+        await asyncio.sleep(self.first_token_delay())
+        self._maybe_fail()
+        tokens = re.findall(r"\S+\s*", canned_reply(self._prompt_text(messages)))
+        delay = 1 / self.tokens_per_second if self.tokens_per_second > 0 else 0
+        for token in tokens:
+            if delay:
+                await asyncio.sleep(delay)
+            yield AIMessageChunk(content=token)
+
+    async def ainvoke(self, messages):
+        parts = [chunk.content async for chunk in self.astream(messages)]
+        return AIMessage(content="".join(parts))
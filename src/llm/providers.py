@@ -0,0 +1,65 @@
+"""
+Registry of chat model providers. Every node gets its model through get_llm(),
+so the provider is chosen in one place (LLM_PROVIDER in src/config.py).
+
+Models are built on first use and then shared by every caller, so the process
+holds one client (and one pool of upstream connections) per provider. Provider
+SDKs are imported inside their factory: importing the app does not pay for
+langchain_google_genai, which dominates `import src.main` otherwise
+(see benchmarks/bench_startup.py).
+"""
+from src.config import (
+    api_key,
+    LLM_PROVIDER,
+    LLM_MODEL,
+    FAKE_LLM_LATENCY_DISTRIBUTION,
+    FAKE_LLM_LATENCY_MS,
+    FAKE_LLM_LATENCY_JITTER_MS,
+    FAKE_LLM_TOKENS_PER_SECOND,
+    FAKE_LLM_ERROR_RATE,
+    FAKE_LLM_ERROR_STATUS,
+    FAKE_LLM_SEED,
+)
+
+_factories = {}
+_instances = {}
+
+
+def register_provider(name: str, factory):
+    """Register `factory()` as the constructor for provider `name`."""
+    _factories[name] = factory
+    _instances.pop(name, None)
+
+
+def get_llm(provider: str = None):
+    """Return the shared model instance for `provider` (LLM_PROVIDER by default)."""
+    name = provider or LLM_PROVIDER
+    if name not in _instances:
+        if name not in _factories:
+            raise ValueError(f"Unknown LLM provider: {name}")
+        _instances[name] = _factories[name]()
+    return _instances[name]
+
+
+def _gemini():
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    return ChatGoogleGenerativeAI(model=LLM_MODEL, api_key=api_key)
+
+
+def _fake():
+    from src.llm.fake import FakeChatModel
+
+    return FakeChatModel(
+        latency_distribution=FAKE_LLM_LATENCY_DISTRIBUTION,
+        latency_ms=FAKE_LLM_LATENCY_MS,
+        latency_jitter_ms=FAKE_LLM_LATENCY_JITTER_MS,
+        tokens_per_second=FAKE_LLM_TOKENS_PER_SECOND,
+        error_rate=FAKE_LLM_ERROR_RATE,
+        error_status=FAKE_LLM_ERROR_STATUS,
+        seed=FAKE_LLM_SEED,
+    )
+
+
+register_provider("gemini", _gemini)
+register_provider("fake", _fake)
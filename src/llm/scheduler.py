@@ -0,0 +1,166 @@
+"""
+Central scheduler for upstream LLM calls.
+
+- A global cap on concurrent calls (LLM_MAX_CONCURRENCY).
+- Weighted fair queuing across users: when calls have to wait, each user's calls
+  are tagged with start-time fair queuing tags, so one user's batch interleaves
+  with everyone else's instead of running ahead of it.
+- Retries with jittered exponential backoff on 429 and 5xx errors. The slot is
+  released while backing off.
+
+The user a call is made for is read from `llm_user_id`, a ContextVar set once per
+request (see get_current_user) or job; calls without a user share one queue.
+"""
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from contextvars import ContextVar
+from loguru import logger
+from src.config import (
+    LLM_MAX_CONCURRENCY,
+    LLM_MAX_RETRIES,
+    LLM_RETRY_BASE_SECONDS,
+    LLM_RETRY_MAX_SECONDS,
+)
+from src.metrics import llm_queue_wait
+
+llm_user_id: ContextVar = ContextVar("llm_user_id", default=None)
+
+RETRYABLE_STATUS = {429}
+
+
+def error_status(exc: BaseException):
+    """HTTP-like status of an upstream error, looking through chained causes."""
+    while exc is not None:
+        for attr in ("status_code", "code"):
+            value = getattr(exc, attr, None)
+            if isinstance(value, int):
+                return value
+        exc = exc.__cause__ or exc.__context__
+    return None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """429 and 5xx are retried, unless the error says otherwise (`retryable = False`)."""
+    if not getattr(exc, "retryable", True):
+        return False
+    status = error_status(exc)
+    return status is not None and (status in RETRYABLE_STATUS or 500 <= status < 600)
+
+
+class LLMScheduler:
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        weights: dict = None,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.weights = dict(weights or {})
+        self.active = 0
+        self._queue = []                 # (start tag, seq, future)
+        self._seq = itertools.count()
+        self._virtual_time = 0.0
+        self._finish_tags = {}           # user -> finish tag of their latest call
+        self._random = random.Random()
+        self.dispatched = 0
+        self.retries = 0
+        self.failures = 0
+        self.max_queue_depth = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def set_weight(self, user_id: str, weight: float):
+        self.weights[user_id] = weight
+
+    def _tag(self, user_id) -> float:
+        start = max(self._virtual_time, self._finish_tags.get(user_id, 0.0))
+        self._finish_tags[user_id] = start + 1 / self.weights.get(user_id, 1.0)
+        return start
+
+    async def _acquire(self, user_id):
+        tag = self._tag(user_id)
+        if self.active < self.max_concurrency and not self._queue:
+            self.active += 1
+            self._virtual_time = tag
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (tag, next(self._seq), future))
+        self.max_queue_depth = max(self.max_queue_depth, len(self._queue))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # The slot may have been handed over just as the caller went away
+            if future.done() and not future.cancelled():
+                self._release()
+            raise
+
+    def _release(self):
+        while self._queue:
+            tag, _, future = heapq.heappop(self._queue)
+            if not future.done():
+                self._virtual_time = tag
+                future.set_result(None)   # the slot passes straight to the next caller
+                return
+        self.active -= 1
+        # Nobody is waiting, so older finish tags no longer affect ordering
+        self._finish_tags = {user: tag for user, tag in self._finish_tags.items() if tag > self._virtual_time}
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for retry number `attempt` (0-based)."""
+        return self._random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def run(self, fn, user_id=None):
+        """Await `fn()` once a slot is free, retrying 429/5xx failures."""
+        user_id = user_id if user_id is not None else llm_user_id.get()
+        attempt = 0
+        while True:
+            queued_at = time.perf_counter()
+            await self._acquire(user_id)
+            waited = time.perf_counter() - queued_at
+            self.dispatched += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+            llm_queue_wait.observe(waited)
+            try:
+                return await fn()
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    self.failures += 1
+                    raise
+                delay = self.backoff(attempt)
+                logger.warning(f"LLM call failed with status {error_status(e)}, retry {attempt + 1} in {delay:.2f}s")
+                self.retries += 1
+                attempt += 1
+            finally:
+                self._release()
+            await asyncio.sleep(delay)
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "active": self.active,
+            "queue_depth": sum(1 for _, _, future in self._queue if not future.done()),
+            "max_queue_depth": self.max_queue_depth,
+            "dispatched": self.dispatched,
+            "retries": self.retries,
+            "failures": self.failures,
+            "wait_seconds_total": self.wait_seconds_total,
+            "wait_seconds_max": self.wait_seconds_max,
+        }
+
+
+llm_scheduler = LLMScheduler(
+    max_concurrency=LLM_MAX_CONCURRENCY,
+    max_retries=LLM_MAX_RETRIES,
+    backoff_base=LLM_RETRY_BASE_SECONDS,
+    backoff_max=LLM_RETRY_MAX_SECONDS,
+)
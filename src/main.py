@@ -1,12 +1,64 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from loguru import logger
+from src import metrics
+from src.auth.hashing import hashing_stats
+from src.config import MONGO_ENSURE_INDEXES, MONGO_PING_ON_STARTUP, SHUTDOWN_DRAIN_TIMEOUT_SECONDS
+from src.database.connection import close_db, connect_db, get_db
+from src.database.indexes import ensure_indexes
 from src.endpoints.router import router as api_router
 from src.endpoints.router_auth import router as auth_router
+from src.lifecycle import on_shutdown_signal
+from src.llm.scheduler import llm_scheduler
+from src.stories.jobs import job_pool
+from src.stories.llm_cache import llm_cache
+from src.stories.singleflight import llm_singleflight
+from src.stories.story_locks import story_locks
+
+metrics.register_stats("password_hash", hashing_stats, "bcrypt thread pool state.")
+metrics.register_stats("llm_cache", llm_cache.stats, "LLM response cache state.")
+metrics.register_stats("llm_scheduler", llm_scheduler.stats, "LLM scheduler slots, queue and retries.")
+metrics.register_stats("llm_single_flight", llm_singleflight.stats, "Coalescing of identical in-flight LLM calls.")
+metrics.register_stats("story_locks", story_locks.stats, "Per-story continuation locks.")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Open the pool before serving; a failed ping stops startup instead of failing the first requests
+    if MONGO_PING_ON_STARTUP:
+        await connect_db()
+
+    if MONGO_ENSURE_INDEXES:
+        db = await get_db()
+        try:
+            await ensure_indexes(db)
+        except Exception as e:
+            logger.error(f"Failed to ensure MongoDB indexes: {e}")
+
+    job_pool.start()
+    # Job workers stop claiming as soon as the server is told to stop, while it
+    # waits for in-flight HTTP requests (see src/lifecycle.py)
+    restore_signals = on_shutdown_signal(job_pool.stop_claiming)
+    yield
+
+    # HTTP requests have drained by now; let running jobs finish, then close the pool
+    restore_signals()
+    await job_pool.stop(drain_timeout=SHUTDOWN_DRAIN_TIMEOUT_SECONDS)
+    await close_db()
+
 
 app = FastAPI(
     title="Interactive Story Generator",
     version="1.0",
-    description="An API for generating interactive stories using AI."
+    description="An API for generating interactive stories using AI.",
+    lifespan=lifespan,
 )
 
 app.include_router(auth_router, prefix="/auth", tags=["Authentication"])
 app.include_router(api_router, prefix="/stories", tags=["Stories"])
+
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
@@ -0,0 +1,207 @@
+"""
+In-process metrics rendered in the Prometheus text exposition format (GET /metrics).
+
+Counters and histograms are updated where the work happens; gauges read their
+value from a callback at scrape time, which is how the existing `stats()`
+helpers (password hashing pool, LLM cache, single flight) are exported.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; LLM calls and whole graph nodes can take tens of seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+# Characters of prompt or completion text
+SIZE_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+
+_registry = []
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()) -> str:
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()   # pymongo listeners may fire off the event loop thread
+        _registry.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values = {} if self.labelnames else {(): 0}   # unlabelled counters start at 0
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}   # labels -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        series = self._values.get(self._key(labels))
+        return series[-1] if series else 0
+
+    def _samples(self):
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._values.items())
+        lines = []
+        for key, series in items:
+            for bound, count in zip(self.buckets + (float("inf"),), series[:len(self.buckets)] + [series[-1]]):
+                labels = _format_labels(self.labelnames, key, [("le", _format_value(float(bound)))])
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{labels} {series[-1]}")
+        return lines
+
+
+class Gauge(_Metric):
+    """A value read from `callback()` at scrape time."""
+    kind = "gauge"
+
+    def __init__(self, name, documentation, callback):
+        super().__init__(name, documentation)
+        self.callback = callback
+
+    def _samples(self):
+        return [f"{self.name} {_format_value(self.callback())}"]
+
+
+def register_stats(prefix: str, stats, documentation: str):
+    """Export every numeric field of `stats()` as a gauge named `<prefix>_<field>`.
+
+    Nested dicts are flattened with underscores and booleans become 0/1.
+    """
+    def flatten(values: dict, path=()):
+        for key, value in values.items():
+            if isinstance(value, dict):
+                yield from flatten(value, path + (key,))
+            elif isinstance(value, (bool, int, float)):
+                yield path + (key,)
+
+    def reader(path):
+        def read():
+            value = stats()
+            for key in path:
+                value = value[key]
+            return int(value) if isinstance(value, bool) else value
+        return read
+
+    for path in flatten(stats()):
+        Gauge("_".join((prefix,) + path), documentation, reader(path))
+
+
+def render() -> str:
+    """Every registered metric in the Prometheus text format."""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ---------------------------
+# Application metrics
+# ---------------------------
+node_duration = Histogram(
+    "story_node_duration_seconds", "Time spent in each LangGraph node.", ["node"],
+)
+llm_call_duration = Histogram(
+    "llm_call_duration_seconds",
+    "LLM call latency, by where the text came from (upstream, cache or coalesced).",
+    ["model", "source"],
+)
+llm_prompt_chars = Histogram(
+    "llm_prompt_chars", "Size of LLM prompts (system + user messages) in characters.", ["model"], buckets=SIZE_BUCKETS,
+)
+llm_completion_chars = Histogram(
+    "llm_completion_chars", "Size of LLM completions in characters.", ["model"], buckets=SIZE_BUCKETS,
+)
+llm_queue_wait = Histogram(
+    "llm_queue_wait_seconds", "Time LLM calls waited in the scheduler for a free slot.",
+)
+llm_errors = Counter("llm_errors_total", "LLM calls that raised.", ["model"])
+mongo_command_duration = Histogram(
+    "mongo_command_duration_seconds", "MongoDB command latency.", ["collection", "command"],
+)
+mongo_command_failures = Counter(
+    "mongo_command_failures_total", "MongoDB commands that failed.", ["collection", "command"],
+)
+character_json_fallbacks = Counter(
+    "character_json_fallbacks_total",
+    "Character replies that could not be parsed: 'characters' used the name-only fallback, 'cast' fell back to a single call.",
+    ["stage"],
+)
+router_decisions = Counter(
+    "router_decisions_total", "Continuation routing decisions by who made them (classifier or llm).", ["source"],
+)
+router_unknown_outputs = Counter(
+    "router_unknown_outputs_total", "Router replies naming no known action (defaulted to append_scene).",
+)
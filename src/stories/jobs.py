@@ -0,0 +1,257 @@
+"""
+Asynchronous story generation jobs.
+
+Endpoints enqueue a job and return immediately; a pool of asyncio workers claims
+jobs from a queue and runs the registered handler for the job's kind. Two queue
+backends are provided so no external broker is needed:
+
+- InMemoryJobQueue: per-process, jobs are lost on restart.
+- MongoJobQueue: jobs live in the `jobs` collection and can be claimed and polled
+  from any worker process. A claim is a lease that every progress update renews;
+  a running job whose lease lapses (its process died) is claimed again, up to
+  JOB_MAX_ATTEMPTS times, and then marked failed.
+"""
+import asyncio
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from loguru import logger
+from pymongo import ReturnDocument
+from src.cache import LRUCache
+from src.config import JOB_QUEUE_BACKEND, JOB_WORKERS, JOB_POLL_INTERVAL_SECONDS, JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS
+from src.database.models import GenerationJobModel
+from src.llm.scheduler import llm_user_id
+
+JOBS_COLLECTION = "jobs"
+
+# Backoff of a worker whose claim failed (e.g. MongoDB briefly unreachable)
+CLAIM_RETRY_BASE_SECONDS = 0.5
+CLAIM_RETRY_MAX_SECONDS = 30
+
+
+class JobQueue(ABC):
+    """Interface for job storage plus the queue of jobs waiting for a worker."""
+
+    @abstractmethod
+    async def put(self, job: GenerationJobModel):
+        ...
+
+    @abstractmethod
+    async def claim(self):
+        """Wait for the next queued job, mark it running and return it."""
+
+    @abstractmethod
+    async def update(self, job_id: str, **fields):
+        ...
+
+    @abstractmethod
+    async def get(self, job_id: str):
+        ...
+
+
+class InMemoryJobQueue(JobQueue):
+    def __init__(self, max_jobs: int = 10000, ttl_seconds: int = 3600):
+        self._jobs = LRUCache(max_entries=max_jobs, ttl_seconds=ttl_seconds)
+        self._pending = asyncio.Queue()
+
+    async def put(self, job):
+        self._jobs.set(job.job_id, job)
+        await self._pending.put(job.job_id)
+
+    async def claim(self):
+        while True:
+            job_id = await self._pending.get()
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.status = "running"
+                job.attempts += 1
+                job.claimed_at = job.updated_at = datetime.now(timezone.utc)
+                return job
+
+    async def update(self, job_id, **fields):
+        job = self._jobs.get(job_id)
+        if job is not None:
+            for key, value in fields.items():
+                setattr(job, key, value)
+            job.updated_at = datetime.now(timezone.utc)
+
+    async def get(self, job_id):
+        return self._jobs.get(job_id)
+
+
+class MongoJobQueue(JobQueue):
+    def __init__(self, poll_interval: float = 0.5, lease_seconds: float = 300, max_attempts: int = 3):
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+    async def _collection(self):
+        from src.database.connection import get_db
+        db = await get_db()
+        return db[JOBS_COLLECTION]
+
+    async def put(self, job):
+        collection = await self._collection()
+        await collection.insert_one(job.model_dump())
+
+    async def claim(self):
+        collection = await self._collection()
+        while True:
+            now = datetime.now(timezone.utc)
+            expired = now - timedelta(seconds=self.lease_seconds)
+            doc = await collection.find_one_and_update(
+                {"$or": [
+                    {"status": "queued"},
+                    # Running jobs whose worker stopped renewing the lease
+                    {"status": "running", "updated_at": {"$lt": expired}, "attempts": {"$not": {"$gte": self.max_attempts}}},
+                ]},
+                {"$set": {"status": "running", "claimed_at": now, "updated_at": now}, "$inc": {"attempts": 1}},
+                sort=[("created_at", 1)],
+                projection={"_id": 0},
+                return_document=ReturnDocument.AFTER,
+            )
+            if doc:
+                if doc["attempts"] > 1:
+                    logger.warning(f"Reclaimed job {doc['job_id']} after its lease expired (attempt {doc['attempts']})")
+                return GenerationJobModel(**doc)
+
+            await collection.update_many(
+                {"status": "running", "updated_at": {"$lt": expired}, "attempts": {"$gte": self.max_attempts}},
+                {"$set": {"status": "failed", "error": "Job was abandoned by its worker too many times", "updated_at": now}},
+            )
+            await asyncio.sleep(self.poll_interval)
+
+    async def update(self, job_id, **fields):
+        collection = await self._collection()
+        fields["updated_at"] = datetime.now(timezone.utc)
+        await collection.update_one({"job_id": job_id}, {"$set": fields})
+
+    async def get(self, job_id):
+        collection = await self._collection()
+        doc = await collection.find_one({"job_id": job_id}, {"_id": 0})
+        return GenerationJobModel(**doc) if doc else None
+
+
+class JobWorkerPool:
+    """Runs `workers` asyncio tasks that claim jobs and dispatch them by kind.
+
+    A handler is `async def handler(job, report_progress) -> dict`; it calls
+    `await report_progress(node_name)` as each graph node finishes and returns the
+    job result.
+    """
+
+    def __init__(self, queue: JobQueue, workers: int = 4):
+        self.queue = queue
+        self.workers = workers
+        self.handlers = {}
+        self._tasks = []
+        self._busy = set()       # numbers of the workers running a job
+        self._draining = False
+
+    def register(self, kind: str, handler):
+        self.handlers[kind] = handler
+
+    async def submit(self, kind: str, user_id: str, prompt: str, **payload) -> GenerationJobModel:
+        now = datetime.now(timezone.utc)
+        job = GenerationJobModel(
+            job_id=str(uuid.uuid4()),
+            kind=kind,
+            user_id=user_id,
+            prompt=prompt,
+            payload=payload,
+            created_at=now,
+            updated_at=now,
+        )
+        await self.queue.put(job)
+        logger.info(f"Queued {kind} job {job.job_id} for user {user_id}")
+        return job
+
+    def start(self):
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker(n)) for n in range(self.workers)]
+            logger.info(f"Started {self.workers} story job workers")
+
+    def stop_claiming(self):
+        """Let running jobs finish but claim no new ones."""
+        if not self._draining:
+            logger.info("Story job workers stop claiming new jobs")
+        self._draining = True
+        for number, task in enumerate(self._tasks):
+            if number not in self._busy:
+                task.cancel()   # idle workers are only waiting for the next job
+
+    async def stop(self, drain_timeout: float = 0):
+        """Stop the workers; jobs already running get `drain_timeout` seconds to finish."""
+        self.stop_claiming()
+        busy = [task for task in self._tasks if not task.done()]
+        if busy and drain_timeout > 0:
+            _, pending = await asyncio.wait(busy, timeout=drain_timeout)
+            if pending:
+                logger.warning(f"Cancelling {len(pending)} story jobs still running after {drain_timeout}s")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._draining = False
+
+    async def _worker(self, number: int):
+        failures = 0
+        while not self._draining:
+            try:
+                job = await self.queue.claim()
+            except Exception:
+                # A worker must outlive transient queue errors, or the pool quietly shrinks
+                delay = min(CLAIM_RETRY_MAX_SECONDS, CLAIM_RETRY_BASE_SECONDS * 2 ** failures)
+                failures += 1
+                logger.exception(f"Worker {number} could not claim a job, retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+            failures = 0
+
+            self._busy.add(number)
+            try:
+                await self._run(job, number)
+            except Exception:
+                # Recording the outcome failed; the lease lets another claim retry the job
+                logger.exception(f"Worker {number} could not record the outcome of job {job.job_id}")
+            finally:
+                self._busy.discard(number)
+
+    async def _run(self, job: GenerationJobModel, number: int):
+        progress = []
+
+        async def report_progress(node: str):
+            progress.append(node)
+            try:
+                await self.queue.update(job.job_id, progress=list(progress))   # also renews the lease
+            except Exception as e:
+                logger.warning(f"Could not record progress of job {job.job_id}: {e}")
+
+        logger.info(f"Worker {number} running {job.kind} job {job.job_id}")
+        llm_user_id.set(job.user_id)
+        try:
+            result = await self.handlers[job.kind](job, report_progress)
+        except asyncio.CancelledError:
+            # Cancelled by stop() after the drain timeout; record it so pollers see the job end
+            logger.warning(f"Job {job.job_id} interrupted by shutdown")
+            await self.queue.update(job.job_id, status="failed", error="Interrupted by server shutdown, please retry")
+            raise
+        except Exception as e:
+            detail = getattr(e, "detail", None) or str(e) or type(e).__name__
+            logger.exception(f"Job {job.job_id} failed")
+            await self.queue.update(job.job_id, status="failed", error=str(detail))
+        else:
+            await self.queue.update(job.job_id, status="succeeded", result=result)
+
+
+def create_job_queue(backend: str) -> JobQueue:
+    if backend == "mongo":
+        return MongoJobQueue(
+            poll_interval=JOB_POLL_INTERVAL_SECONDS, lease_seconds=JOB_LEASE_SECONDS, max_attempts=JOB_MAX_ATTEMPTS
+        )
+    if backend == "memory":
+        return InMemoryJobQueue()
+    raise ValueError(f"Unknown job queue backend: {backend}")
+
+
+job_pool = JobWorkerPool(create_job_queue(JOB_QUEUE_BACKEND), workers=JOB_WORKERS)
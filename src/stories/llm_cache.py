@@ -0,0 +1,109 @@
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+from loguru import logger
+from src.cache import LRUCache
+from src.config import (
+    LLM_CACHE_ENABLED,
+    LLM_CACHE_MAX_ENTRIES,
+    LLM_CACHE_TTL_SECONDS,
+    LLM_CACHE_MONGO_ENABLED,
+)
+
+CACHE_COLLECTION = "llm_cache"
+
+
+def cache_key(model_name: str, system_instruction: str, prompt_text: str) -> str:
+    """Content address of a completion: model + system instruction + prompt."""
+    payload = json.dumps([model_name, system_instruction, prompt_text], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """Two-tier cache for LLM completions.
+
+    The first tier is an in-process LRU with TTL. The optional second tier is a
+    Mongo collection shared by every worker; its entries expire through a TTL index.
+    Failures in the Mongo tier are logged and treated as misses.
+    """
+
+    def __init__(self, enabled: bool = True, max_entries: int = 1024, ttl_seconds: int = 3600, use_mongo: bool = False):
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self.use_mongo = use_mongo
+        self.memory = LRUCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.mongo_hits = 0
+        self.mongo_misses = 0
+        self._ttl_index_ready = False
+
+    async def _collection(self):
+        from src.database.connection import get_db   # avoid importing the DB layer for memory-only use
+        db = await get_db()
+        if db is None:
+            return None
+        collection = db[CACHE_COLLECTION]
+        if not self._ttl_index_ready:
+            await collection.create_index("created_at", expireAfterSeconds=self.ttl_seconds)
+            self._ttl_index_ready = True
+        return collection
+
+    async def get(self, key: str):
+        if not self.enabled:
+            return None
+
+        text = self.memory.get(key)
+        if text is not None or not self.use_mongo:
+            return text
+
+        try:
+            collection = await self._collection()
+            doc = await collection.find_one({"_id": key}) if collection is not None else None
+        except Exception as e:
+            logger.warning(f"LLM cache lookup in Mongo failed: {e}")
+            return None
+
+        if doc:
+            created_at = doc["created_at"]
+            if created_at.tzinfo is None:
+                created_at = created_at.replace(tzinfo=timezone.utc)
+            # The TTL monitor only runs about once a minute, so check the age here too
+            if datetime.now(timezone.utc) - created_at < timedelta(seconds=self.ttl_seconds):
+                self.mongo_hits += 1
+                self.memory.set(key, doc["text"])
+                return doc["text"]
+
+        self.mongo_misses += 1
+        return None
+
+    async def set(self, key: str, text: str, model_name: str = ""):
+        if not self.enabled:
+            return
+
+        self.memory.set(key, text)
+        if not self.use_mongo:
+            return
+
+        try:
+            collection = await self._collection()
+            if collection is not None:
+                await collection.update_one(
+                    {"_id": key},
+                    {"$set": {"text": text, "model": model_name, "created_at": datetime.now(timezone.utc)}},
+                    upsert=True,
+                )
+        except Exception as e:
+            logger.warning(f"LLM cache write to Mongo failed: {e}")
+
+    def stats(self) -> dict:
+        stats = {"enabled": self.enabled, "memory": self.memory.stats()}
+        if self.use_mongo:
+            stats["mongo"] = {"hits": self.mongo_hits, "misses": self.mongo_misses}
+        return stats
+
+
+llm_cache = LLMCache(
+    enabled=LLM_CACHE_ENABLED,
+    max_entries=LLM_CACHE_MAX_ENTRIES,
+    ttl_seconds=LLM_CACHE_TTL_SECONDS,
+    use_mongo=LLM_CACHE_MONGO_ENABLED,
+)
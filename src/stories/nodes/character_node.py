@@ -1,9 +1,14 @@
+import asyncio
 import json
+from src.config import CHARACTER_GENERATION_MODE, CHARACTER_PROFILE_RETRIES
 from src.database.models import StoryStateModel
-from src.stories.nodes.prompts import character_prompt
+from src.metrics import character_json_fallbacks
+from src.stories.nodes.prompts import character_prompt, cast_prompt, character_profile_prompt
 from src.stories.utils import run_llm
 from loguru import logger
 
+SYSTEM_INSTRUCTION = "You are a creative character designer."
+
 async def character_node(state: StoryStateModel, story_history: list) -> StoryStateModel:
     logger.info("Starting character_node for story with prompt: {}", state.prompt)
     
@@ -11,12 +16,21 @@ async def character_node(state: StoryStateModel, story_history: list) -> StorySt
     logger.debug("Set current_node to 'character_node'")
 
     outline_text = "\n".join(state.outline) if state.outline else "No outline provided."
+
+    if CHARACTER_GENERATION_MODE == "parallel":
+        characters = await generate_characters_parallel(outline_text, story_history)
+        if characters:
+            state.characters = characters
+            return state
+        character_json_fallbacks.inc(stage="cast")
+        logger.warning("Parallel character generation returned no cast, falling back to a single call")
+
     prompt_text = character_prompt.replace("{outline}", outline_text)
     logger.debug("Formatted character prompt:\n{}", prompt_text)
 
     text = await run_llm(
         prompt_text,
-        "You are a creative character designer.",
+        SYSTEM_INSTRUCTION,
         story_history
     )
     logger.info("LLM returned text with {} characters", len(text) if text else 0)
@@ -30,9 +44,62 @@ async def character_node(state: StoryStateModel, story_history: list) -> StorySt
             logger.info("Parsed {} characters from LLM JSON", len(characters_json))
         else:
             state.characters = [{"name": str(characters_json)}]
+            character_json_fallbacks.inc(stage="characters")
             logger.warning("LLM JSON was not a list, wrapped in dict: {}", characters_json)
     except json.JSONDecodeError:
         state.characters = [{"name": text.strip()}]
+        character_json_fallbacks.inc(stage="characters")
         logger.error("Failed to parse JSON from LLM output, fallback used")
 
     return state
+
+
+async def generate_characters_parallel(outline_text: str, story_history: list) -> list:
+    """Ask for the cast (names and roles) first, then write every profile concurrently.
+
+    Profiles keep the order of the cast list. Returns an empty list if the cast
+    could not be parsed.
+    """
+    text = await run_llm(cast_prompt.replace("{outline}", outline_text), SYSTEM_INSTRUCTION, story_history)
+    try:
+        cast = json.loads(text)
+    except json.JSONDecodeError:
+        logger.error("Failed to parse cast JSON from LLM output")
+        return []
+
+    # Keep members with a usable name; roles and other fields are coerced per profile
+    cast = [
+        member for member in cast
+        if isinstance(member, dict) and isinstance(member.get("name"), str) and member["name"].strip()
+    ] if isinstance(cast, list) else []
+    logger.info("Generating {} character profiles concurrently", len(cast))
+
+    return await asyncio.gather(*(
+        generate_character_profile(outline_text, member, story_history) for member in cast
+    ))
+
+
+async def generate_character_profile(outline_text: str, member: dict, story_history: list) -> dict:
+    name, role = member["name"], str(member.get("role") or "No role specified.")
+
+    # Each profile is retried on its own; a retry bypasses the cached reply
+    for attempt in range(CHARACTER_PROFILE_RETRIES + 1):
+        try:
+            prompt_text = (
+                character_profile_prompt
+                .replace("{outline}", outline_text)
+                .replace("{name}", name)
+                .replace("{role}", role)
+            )
+            text = await run_llm(prompt_text, SYSTEM_INSTRUCTION, story_history, use_cache=attempt == 0)
+            profile = json.loads(text)
+            if isinstance(profile, dict):
+                return {**profile, "name": name, "role": profile.get("role") or role}
+            logger.warning("Profile for {} was not a JSON object (attempt {})", name, attempt + 1)
+        except json.JSONDecodeError:
+            logger.warning("Failed to parse profile JSON for {} (attempt {})", name, attempt + 1)
+        except Exception as e:
+            logger.warning("Profile generation for {} failed (attempt {}): {}", name, attempt + 1, e)
+
+    logger.error("Giving up on profile for {}, keeping name and role only", name)
+    return {"name": name, "role": role}
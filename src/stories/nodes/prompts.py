@@ -48,3 +48,35 @@ Guidelines:
 
 Return only the story text (no extra explanations).
 """
+cast_prompt="""You are a creative character designer.  
+Using the following plot outline:
+
+"{outline}"
+
+List the 2–4 main characters of this story.  
+Return the output as a valid JSON list of objects, only JSON, no markdown or code fences:
+[
+  {
+    "name": "...",
+    "role": "..."
+  }
+]
+"""
+character_profile_prompt="""You are a creative character designer.  
+Using the following plot outline:
+
+"{outline}"
+
+Write the profile of the character "{name}", whose role in the story is: {role}.  
+The profile must include:
+- Background  
+- Personality & motivations  
+
+Return the output as a single valid JSON object, only JSON, no markdown or code fences:
+{
+  "name": "{name}",
+  "background": "...",
+  "motivations": "...",
+  "role": "{role}"
+}
+"""
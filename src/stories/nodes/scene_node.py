@@ -24,7 +24,8 @@ async def scene_node(state: StoryStateModel, story_history: list) -> StoryStateM
     text = await run_llm(
         prompt_text,
         "You are a professional novelist.",
-        story_history
+        story_history,
+        stream_tokens=True
     )
     logger.info("LLM returned text with {} characters", len(text) if text else 0)
     logger.debug("LLM output:\n{}", text or "<empty output>")
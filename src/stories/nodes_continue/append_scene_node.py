@@ -1,8 +1,7 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
 from src.database.models import StoryStateModel
-from src.config import api_key
 from src.stories.nodes_continue.prompts import append_scene_prompt
-llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash-lite", api_key=api_key)
+from src.stories.summary import story_context
+from src.stories.utils import call_llm
 
 async def append_scene_node(state: StoryStateModel,story_history:list) -> StoryStateModel:
     if state.scenes:
@@ -10,7 +9,7 @@ async def append_scene_node(state: StoryStateModel,story_history:list) -> StoryS
     else:
         last_scene = ""
 
-    outline_text = "\n".join(state.outline)
+    outline_text = story_context(state)
     names = []
     for character in state.characters:
         name = character.get("name")
@@ -25,8 +24,9 @@ async def append_scene_node(state: StoryStateModel,story_history:list) -> StoryS
             characters=characters_text
         )
 
-    response = await llm.ainvoke([{"role": "user", "content": prompt_text}])
-    assistant_text = response.content.strip()
+    # Stream the scene so callers can forward tokens as they arrive
+    assistant_text = await call_llm([{"role": "user", "content": prompt_text}], stream_tokens=True)
+    assistant_text = assistant_text.strip()
     assistant_text_clean = " ".join(assistant_text.split())  # collapses newlines + extra spaces
 
     state.scenes.append(assistant_text_clean)
@@ -1,20 +1,44 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
+import re
+from src.config import ROUTER_CLASSIFIER_ENABLED
 from src.database.models import StoryStateModel
-from src.config import api_key
+from src.metrics import router_decisions, router_unknown_outputs
 from src.stories.nodes_continue.prompts import continue_router_prompt
+from src.stories.nodes_continue.router_classifier import ACTIONS, classify_actions
+from src.stories.summary import story_context
+from src.stories.utils import call_llm
 
-llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash-lite", api_key=api_key)
+
+def parse_actions(text: str) -> list[str]:
+    """Extract the known action keywords from the model's reply.
+
+    Anything that names no valid action falls back to appending a scene.
+    """
+    found = set(re.findall(r"extend_plot|develop_character|append_scene", text.lower()))
+    if not found:
+        router_unknown_outputs.inc()
+        return ["append_scene"]
+    return [action for action in ACTIONS if action in found]
 
 async def continuation_router_node(state: StoryStateModel,story_history:list) -> StoryStateModel:
+    state.current_node = "continuation_router_node"
+
+    # Clear-cut inputs are routed locally, saving an LLM round trip
+    actions = classify_actions(state.prompt) if ROUTER_CLASSIFIER_ENABLED else None
+    if actions:
+        router_decisions.inc(source="classifier")
+        story_history.append({"role": "assistant", "content": ", ".join(actions)})
+        state.actions = actions
+        return state
+
     # Format prompt for LLM
     prompt_text = continue_router_prompt.format(
         input=state.prompt,
-        state_summary=" ".join(state.outline)
+        state_summary=story_context(state)
     )
 
     # Call LLM
-    response = await llm.ainvoke([{"role": "user", "content": prompt_text}])
-    assistant_text = response.content.strip()
+    assistant_text = await call_llm([{"role": "user", "content": prompt_text}])
+    assistant_text = assistant_text.strip()
 
     # Clean text for history
     assistant_text_clean = " ".join(assistant_text.split())
@@ -22,8 +46,8 @@ async def continuation_router_node(state: StoryStateModel,story_history:list) ->
     # Append to history
     story_history.append({"role": "assistant", "content": assistant_text_clean})
 
-    # Directly set the node name returned by the model
-    # This will match one of the conditional edges in LangGraph
-    state.current_node = assistant_text_clean.lower().strip()
+    # The chosen actions drive the conditional edges in LangGraph
+    router_decisions.inc(source="llm")
+    state.actions = parse_actions(assistant_text_clean)
 
     return state
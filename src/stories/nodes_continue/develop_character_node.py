@@ -1,35 +1,35 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
 from src.database.models import StoryStateModel
-from src.config import api_key
 from src.stories.nodes_continue.prompts import develop_character
-llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash-lite", api_key=api_key)
+from src.stories.utils import call_llm
 
 
-async def develop_character_node(state: StoryStateModel,story_history:list) -> StoryStateModel:
-    # Choose a target character from user_input or default to first
-    if state.prompt:
-        target = state.prompt
+async def develop_character_node(state: StoryStateModel,story_history:list) -> dict:
+    # Choose the character named in the user input, or default to the first one
+    names = [char.get("name") for char in state.characters if char.get("name")]
+    mentioned = [name for name in names if name.lower() in (state.prompt or "").lower()]
+    if mentioned:
+        target = mentioned[0]
+    elif names:
+        target = names[0]
     else:
-        if state.characters:
-            target = state.characters[0]["name"]
-        else:
-            target = "Character"
+        target = "Character"
 
-
-    
     prompt_text = develop_character.format(
             input=state.prompt,
             character=target
         )
 
-    response = await llm.ainvoke([{"role": "user", "content": prompt_text}])
-    assistant_text = response.content.strip()
+    assistant_text = await call_llm([{"role": "user", "content": prompt_text}])
+    assistant_text = assistant_text.strip()
 
-    # Update a character 
+    # Update a character (as a new dict, the current one is shared graph state)
+    characters = []
     for char in state.characters:
         if char.get("name") == target:
-            char["background"] = char.get("background", "") + " " + assistant_text
+            char = {**char, "background": char.get("background", "") + " " + assistant_text}
+        characters.append(char)
 
     story_history.append({"role": "assistant", "content": assistant_text})
-    state.current_node = "continuation_router_node"  # loop back
-    return state
+
+    # May run in parallel with extend_plot_node, so only return the fields it changed
+    return {"characters": characters, "current_node": "develop_character_node"}
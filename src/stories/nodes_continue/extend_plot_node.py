@@ -1,18 +1,19 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
 from src.database.models import StoryStateModel
-from src.config import api_key
 from src.stories.nodes_continue.prompts import extended_plot_outline_prompt
-llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash-lite", api_key=api_key)
+from src.stories.summary import recent_outline
+from src.stories.utils import call_llm
 
-async def extend_plot_node(state: StoryStateModel,story_history:list) -> StoryStateModel:
+async def extend_plot_node(state: StoryStateModel,story_history:list) -> dict:
     
+    # Only the events not yet covered by the rolling summary are sent and rewritten
     prompt_text = extended_plot_outline_prompt.format(
+            summary=f"Story so far: {state.summary}\n" if state.summary else "",
             input=state.prompt,
-            outline="\n".join(state.outline)
+            outline="\n".join(recent_outline(state))
         )
 
-    response = await llm.ainvoke([{"role": "user", "content": prompt_text}])
-    assistant_text = response.content.strip()
+    assistant_text = await call_llm([{"role": "user", "content": prompt_text}])
+    assistant_text = assistant_text.strip()
 
     # Clean lines and update outline
     lines = assistant_text.splitlines()  # Split the text into individual lines
@@ -23,9 +24,8 @@ async def extend_plot_node(state: StoryStateModel,story_history:list) -> StorySt
         if stripped_line:  # Only keep non-empty lines
             clean_lines.append(stripped_line)
 
-    state.outline = clean_lines
-
-
     story_history.append({"role": "assistant", "content": assistant_text})
-    state.current_node = "continuation_router_node"  # loop back
-    return state
+
+    # May run in parallel with develop_character_node, so only return the fields it changed
+    outline = state.outline[:state.summarized_outline] + clean_lines
+    return {"outline": outline, "current_node": "extend_plot_node"}
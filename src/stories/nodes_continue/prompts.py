@@ -18,16 +18,26 @@ There are three possible actions:
 2. develop_character — the input adds depth, traits, or arcs to an existing character.  
 3. append_scene — the input continues the story by adding narrative to the next scene.
 
-Choose the single action that best fits the input.  
-Return **only** the chosen action keyword: 'extend_plot', 'develop_character', or 'append_scene'.
+Choose every action the input calls for; an input can both add an event and develop a character.  
+Return **only** the chosen action keywords separated by commas, for example: 'extend_plot, develop_character'.
 """
 
 develop_character="""Develop the character '{character}' in response to '{input}', updating their profile with new traits or arcs.
 Output concise updates suitable to append to the character's profile.
 Return only the updated character profile text (no extra explanations).
 """
-extended_plot_outline_prompt="""Extend the plot outline:
+extended_plot_outline_prompt="""{summary}Extend the plot outline:
 '{outline}'
 by incorporating '{input}', adding 1-2 new events while maintaining consistency.
 Output each event as 1-2 sentences.
 Return the updated outline as a structured list of events."""
+
+summary_prompt="""Update the running summary of a story.
+Current summary:
+'{summary}'
+
+Events and scenes that happened since:
+{new_content}
+
+Write the updated summary in at most 200 words, keeping the key plot points, character changes and open threads.
+Return only the summary text (no extra explanations)."""
@@ -0,0 +1,138 @@
+"""
+Local classifier that picks continuation actions without an LLM round trip.
+
+Two signals are combined:
+
+- keyword/pattern rules;
+- a small multinomial Naive Bayes model over the prompt's words, trained at
+  import time on the labelled examples below.
+
+`classify_actions` returns the rule matches unless the model confidently
+disagrees with them, or the model's answer alone when no rule fired and it is
+confident; otherwise it returns None and the router asks the LLM.
+"""
+import math
+import re
+from collections import Counter
+from src.config import ROUTER_CLASSIFIER_THRESHOLD
+
+# Valid continuation actions, in the order their branches are listed
+ACTIONS = ["extend_plot", "develop_character", "append_scene"]
+
+RULES = {
+    "extend_plot": re.compile(
+        r"\b(suddenly|meanwhile|twist|reveal\w*|discover\w*|betray\w*|attack\w*|ambush\w*|invade\w*|"
+        r"explode\w*|explosion|storm|war|kidnap\w*|arrive\w*|new (event|threat|enemy|mystery)|plot)\b"
+    ),
+    "develop_character": re.compile(
+        r"\b(feel\w*|fear\w*|afraid|remember\w*|backstory|past|personality|trait\w*|motivation\w*|"
+        r"grow\w*|learn\w*|realiz\w*|realis\w*|trust\w*|doubt\w*|emotion\w*|regret\w*|confess\w*|"
+        r"becomes? (more|less)|character)\b"
+    ),
+    "append_scene": re.compile(
+        r"^\s*(continue|go on|keep going|more|next|and then)\b|\b(next scene|what happens next|continue the story)\b"
+    ),
+}
+
+TRAINING_EXAMPLES = [
+    ("extend_plot", "suddenly the city is attacked by raiders"),
+    ("extend_plot", "a new enemy arrives from the north"),
+    ("extend_plot", "reveal that the mentor was the traitor all along"),
+    ("extend_plot", "an earthquake destroys the bridge"),
+    ("extend_plot", "the heroes discover a hidden map"),
+    ("extend_plot", "the king is assassinated at the feast"),
+    ("extend_plot", "a storm wrecks the ship and strands them on an island"),
+    ("extend_plot", "introduce a rival crew who steals the treasure"),
+    ("extend_plot", "the police raid the hideout"),
+    ("extend_plot", "war breaks out between the two kingdoms"),
+    ("extend_plot", "add a twist where the letter was forged"),
+    ("extend_plot", "the dragon kidnaps the princess"),
+    ("develop_character", "show that she is afraid of the dark"),
+    ("develop_character", "explore his backstory as a soldier"),
+    ("develop_character", "make him more trusting of strangers"),
+    ("develop_character", "she remembers her childhood and feels regret"),
+    ("develop_character", "give the villain a sympathetic motivation"),
+    ("develop_character", "he learns to control his anger"),
+    ("develop_character", "reveal her insecurity about leading the team"),
+    ("develop_character", "the captain doubts her own decisions"),
+    ("develop_character", "deepen the friendship between the two heroes"),
+    ("develop_character", "he confesses his feelings to her"),
+    ("develop_character", "show how the loss changed his personality"),
+    ("develop_character", "make the mentor grumpier but kind"),
+    ("append_scene", "continue"),
+    ("append_scene", "go on"),
+    ("append_scene", "keep going with the story"),
+    ("append_scene", "what happens next"),
+    ("append_scene", "write the next scene"),
+    ("append_scene", "continue the story"),
+    ("append_scene", "describe them walking through the market"),
+    ("append_scene", "they sit by the fire and talk"),
+    ("append_scene", "the group travels to the next town"),
+    ("append_scene", "more please"),
+    ("append_scene", "describe the morning at the camp"),
+    ("append_scene", "they eat dinner together"),
+]
+
+STOPWORDS = {"a", "an", "the", "to", "of", "and", "is", "at", "on", "in", "by", "with", "his", "her", "their", "them", "they", "he", "she", "it"}
+
+
+def tokenize(text: str) -> list[str]:
+    return [word for word in re.findall(r"[a-z']+", text.lower()) if word not in STOPWORDS]
+
+
+class NaiveBayes:
+    """Multinomial Naive Bayes with Laplace smoothing."""
+
+    def __init__(self, examples):
+        self.word_counts = {label: Counter() for label in ACTIONS}
+        self.doc_counts = Counter()
+        for label, text in examples:
+            self.doc_counts[label] += 1
+            self.word_counts[label].update(tokenize(text))
+        self.vocabulary = set().union(*self.word_counts.values())
+        self.totals = {label: sum(counts.values()) for label, counts in self.word_counts.items()}
+
+    def predict_proba(self, text: str) -> dict:
+        words = [word for word in tokenize(text) if word in self.vocabulary]
+        total_docs = sum(self.doc_counts.values())
+        scores = {}
+        for label in ACTIONS:
+            score = math.log(self.doc_counts[label] / total_docs)
+            denominator = self.totals[label] + len(self.vocabulary)
+            for word in words:
+                score += math.log((self.word_counts[label][word] + 1) / denominator)
+            scores[label] = score
+        top = max(scores.values())
+        exp = {label: math.exp(score - top) for label, score in scores.items()}
+        norm = sum(exp.values())
+        return {label: value / norm for label, value in exp.items()}
+
+
+model = NaiveBayes(TRAINING_EXAMPLES)
+
+
+def rule_matches(text: str) -> set[str]:
+    lowered = text.lower()
+    return {action for action, pattern in RULES.items() if pattern.search(lowered)}
+
+
+def classify_actions(text: str, threshold: float = ROUTER_CLASSIFIER_THRESHOLD):
+    """Return the actions for `text` in branch order, or None when unsure."""
+    if not text or not text.strip():
+        return ["append_scene"]
+
+    matched = rule_matches(text)
+    probabilities = model.predict_proba(text)
+    top = max(probabilities, key=probabilities.get)
+
+    if matched:
+        # A confident model that disagrees with every rule that fired is a conflict
+        if top not in matched and probabilities[top] >= threshold:
+            return None
+        chosen = matched
+    elif probabilities[top] >= threshold:
+        chosen = {top}
+    else:
+        return None
+
+    return [action for action in ACTIONS if action in chosen]
@@ -0,0 +1,43 @@
+import asyncio
+
+
+class SingleFlight:
+    """De-duplicates concurrent calls that share a key.
+
+    The first caller for a key starts the work as its own task; callers arriving
+    while it is still running await the same task instead of starting another.
+    The task is shielded, so a cancelled caller does not cancel it for the others.
+    """
+
+    def __init__(self):
+        self._inflight = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def inflight(self, key) -> bool:
+        return key in self._inflight
+
+    async def do(self, key, fn):
+        task = self._inflight.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._inflight),
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+        }
+
+
+llm_singleflight = SingleFlight()
@@ -0,0 +1,61 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+
+class LockBusy(Exception):
+    """Raised by `KeyedLock.hold(key, wait=False)` while the key is held or awaited."""
+
+
+class KeyedLock:
+    """One asyncio lock per key, created on first use and dropped when unused.
+
+    Continuations hold the lock of their story for the whole turn (load, graph,
+    save), so turns on one story run one after another and each one starts from
+    the state the previous one saved. The lock is per process; the version guard
+    on the update still catches turns racing in other workers.
+    """
+
+    def __init__(self):
+        self._locks = {}   # key -> [lock, holders + waiters]
+        self.acquired = 0
+        self.waited = 0
+        self.rejected = 0
+
+    def locked(self, key) -> bool:
+        entry = self._locks.get(key)
+        return entry is not None and entry[0].locked()
+
+    @asynccontextmanager
+    async def hold(self, key, wait: bool = True):
+        """Hold the lock of `key`. With `wait=False`, raise LockBusy instead of waiting.
+
+        The check and the claim happen without yielding to the event loop, so two
+        callers can never both see the key free.
+        """
+        if not wait and key in self._locks:
+            self.rejected += 1
+            raise LockBusy(key)
+        entry = self._locks.setdefault(key, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            if entry[0].locked():
+                self.waited += 1
+            async with entry[0]:
+                self.acquired += 1
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[key]
+
+    def stats(self) -> dict:
+        return {
+            "held": sum(1 for lock, _ in self._locks.values() if lock.locked()),
+            "waiting": sum(users - lock.locked() for lock, users in self._locks.values()),
+            "acquired": self.acquired,
+            "waited": self.waited,
+            "rejected": self.rejected,
+        }
+
+
+story_locks = KeyedLock()
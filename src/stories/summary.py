@@ -0,0 +1,78 @@
+"""
+Rolling summary that keeps continuation prompts a bounded size.
+
+The outline only ever grows, and continuation prompts send the part of it not yet
+covered by `state.summary` (older scenes are never sent; only the last one is).
+Once that part goes over SUMMARY_TOKEN_BUDGET, everything except the most recent
+events and scenes is folded into the summary with one LLM call. Prompts then use
+`story_context(state)` (summary + recent events) instead of the full outline, so
+their size, and the per-turn latency, stays roughly flat over a story's life.
+
+`summarize` runs after a turn has been saved (see src/endpoints/router.py), so the
+summary is ready for the next turn without delaying the current one.
+"""
+from typing import Optional
+from src.config import SUMMARY_TOKEN_BUDGET, SUMMARY_RECENT_EVENTS, SUMMARY_RECENT_SCENES
+from src.database.models import StoryStateModel
+from src.stories.nodes_continue.prompts import summary_prompt
+from src.stories.utils import call_llm
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token for English prose)."""
+    return (len(text) + 3) // 4
+
+
+def recent_outline(state: StoryStateModel) -> list[str]:
+    """Outline events not yet folded into the summary."""
+    return state.outline[state.summarized_outline:]
+
+
+def unsummarized_tokens(state: StoryStateModel) -> int:
+    """Estimated size of the outline events that prompts send in full."""
+    return sum(estimate_tokens(event) for event in recent_outline(state))
+
+
+def needs_summary(state: StoryStateModel, budget: int = SUMMARY_TOKEN_BUDGET) -> bool:
+    events, _ = summary_items(state)
+    return unsummarized_tokens(state) > budget and bool(events)
+
+
+def summary_items(state: StoryStateModel) -> tuple[list[str], list[str]]:
+    """The events and scenes to fold in next: everything but the most recent ones."""
+    outline_end = max(state.summarized_outline, len(state.outline) - SUMMARY_RECENT_EVENTS)
+    scenes_end = max(state.summarized_scenes, len(state.scenes) - SUMMARY_RECENT_SCENES)
+    return state.outline[state.summarized_outline:outline_end], state.scenes[state.summarized_scenes:scenes_end]
+
+
+def story_context(state: StoryStateModel) -> str:
+    """Summary so far plus the recent outline events, for continuation prompts."""
+    events = "\n".join(recent_outline(state))
+    if not state.summary:
+        return events
+    return f"Story so far: {state.summary}\nRecent events:\n{events}"
+
+
+async def summarize(state: StoryStateModel) -> Optional[dict]:
+    """Fold the older events and scenes into the summary.
+
+    Returns the new `summary`, `summarized_outline` and `summarized_scenes`, or
+    None when there is nothing to fold or the model returned nothing.
+    """
+    events, scenes = summary_items(state)
+    if not events and not scenes:
+        return None
+
+    new_content = "\n".join([f"Event: {event}" for event in events] + [f"Scene: {scene}" for scene in scenes])
+    prompt_text = summary_prompt.format(summary=state.summary or "(none yet)", new_content=new_content)
+
+    assistant_text = " ".join((await call_llm([{"role": "user", "content": prompt_text}])).split())
+    if not assistant_text:
+        # Keep the items unsummarized and try again after the next turn
+        return None
+
+    return {
+        "summary": assistant_text,
+        "summarized_outline": state.summarized_outline + len(events),
+        "summarized_scenes": state.summarized_scenes + len(scenes),
+    }
@@ -1,21 +1,99 @@
 # src/stories/nodes/utils.py
-from langchain_google_genai import ChatGoogleGenerativeAI
-from src.config import api_key
-
-# Single LLM instance
-llm = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash-lite",
-    api_key=api_key
-)
-
-async def run_llm(prompt_text: str, system_instruction: str, story_history: list) -> str:
-    """Send prompt to Gemini and return plain text response."""
-    response = await llm.ainvoke([
+import time
+from langgraph.config import get_config, get_stream_writer
+from src.llm.providers import get_llm
+from src.llm.scheduler import llm_scheduler
+from src.metrics import llm_call_duration, llm_prompt_chars, llm_completion_chars, llm_errors
+from src.stories.llm_cache import llm_cache, cache_key
+from src.stories.singleflight import llm_singleflight
+
+class StreamInterruptedError(Exception):
+    """The model failed mid-stream; retrying would send the first tokens twice."""
+    retryable = False
+
+def token_writer():
+    """Return a callable that emits streamed tokens as LangGraph custom events.
+
+    Outside of a graph run (e.g. a node called directly in tests) this is a no-op.
+    """
+    try:
+        writer = get_stream_writer()
+        node = get_config()["metadata"].get("langgraph_node")
+    except (RuntimeError, KeyError):
+        return lambda token: None
+    return lambda token: writer({"node": node, "token": token})
+
+async def stream_llm(messages: list, stream_tokens: bool = False, model=None) -> str:
+    """Stream a completion from `model` (the configured provider by default) and return the full text.
+
+    When `stream_tokens` is set, each chunk is forwarded to the graph's custom stream.
+    """
+    write_token = token_writer() if stream_tokens else (lambda token: None)
+    parts = []
+    try:
+        async for chunk in (model or get_llm()).astream(messages):
+            if chunk.content:
+                parts.append(chunk.content)
+                write_token(chunk.content)
+    except Exception as e:
+        if stream_tokens and parts:
+            raise StreamInterruptedError("LLM stream failed after tokens were sent") from e
+        raise
+    return "".join(parts)
+
+def model_name(model) -> str:
+    return getattr(model, "model", None) or type(model).__name__
+
+async def call_llm(messages: list, stream_tokens: bool = False, model=None, use_cache: bool = True) -> str:
+    """Entry point for every LLM call: serve from the response cache, else stream from the model.
+
+    Identical calls already in flight are coalesced onto one upstream request, which
+    goes through the LLM scheduler (concurrency cap, per-user fairness, retries). Callers
+    that did not make the request themselves (cache hits and coalesced callers) get the
+    whole text as a single token when `stream_tokens` is set. With `use_cache=False`
+    the cached entry is skipped (and replaced), e.g. when retrying an unusable reply.
+    """
+    model = model or get_llm()
+    name = model_name(model)
+    system_instruction = "\n".join(m["content"] for m in messages if m["role"] == "system")
+    prompt_text = "\n".join(m["content"] for m in messages if m["role"] != "system")
+    key = cache_key(name, system_instruction, prompt_text)
+    start = time.perf_counter()
+    llm_prompt_chars.observe(len(system_instruction) + len(prompt_text), model=name)
+
+    text = await llm_cache.get(key) if use_cache else None
+    if text is not None:
+        if stream_tokens:
+            token_writer()(text)
+        llm_call_duration.observe(time.perf_counter() - start, model=name, source="cache")
+        return text
+
+    async def generate():
+        text = await llm_scheduler.run(lambda: stream_llm(messages, stream_tokens=stream_tokens, model=model))
+        llm_completion_chars.observe(len(text), model=name)
+        if text.strip():
+            await llm_cache.set(key, text, name)
+        return text
+
+    leader = not llm_singleflight.inflight(key)
+    try:
+        text = await llm_singleflight.do(key, generate)
+    except Exception:
+        llm_errors.inc(model=name)
+        raise
+    if stream_tokens and not leader:
+        token_writer()(text)
+    llm_call_duration.observe(time.perf_counter() - start, model=name, source="upstream" if leader else "coalesced")
+    return text
+
+async def run_llm(prompt_text: str, system_instruction: str, story_history: list, stream_tokens: bool = False, use_cache: bool = True) -> str:
+    """Send prompt to the LLM and return plain text response."""
+    text = await call_llm([
         {"role": "system", "content": system_instruction},
         {"role": "user", "content": prompt_text}
-    ])
+    ], stream_tokens=stream_tokens, use_cache=use_cache)
 
-    text = response.content.strip()
+    text = text.strip()
 
     # Save in history (compact for logging/debugging)
     history_text = text.replace("\n", " ").strip()
@@ -0,0 +1,42 @@
+"""
+The API view of a story, built in one place.
+
+`full_story_view` renders a story state into the `full_story` JSON sent to
+clients. It is stored on the story document when the story is written (and kept
+in sync through the same delta updates as the state), so reads serve it as-is.
+"""
+from src.database.models import StoryStateModel
+
+CHARACTER_DEFAULTS = {
+    "name": "Unknown",
+    "background": "No background available.",
+    "motivations": "No motivations specified.",
+    "role": "No role specified.",
+}
+
+
+def full_story_view(state) -> dict:
+    """Outline, characters (with defaults filled in) and numbered scenes of `state`."""
+    if isinstance(state, StoryStateModel):
+        outline, characters, scenes = state.outline, state.characters, state.scenes
+    else:
+        outline, characters, scenes = state.get("outline") or [], state.get("characters") or [], state.get("scenes") or []
+    return {
+        "outline": list(outline),
+        "characters": [{key: c.get(key, default) for key, default in CHARACTER_DEFAULTS.items()} for c in characters],
+        "scenes": [{"scene_number": idx, "content": scene} for idx, scene in enumerate(scenes, start=1)],
+    }
+
+
+def story_view(story_doc: dict) -> dict:
+    """The StoryResponse fields of a story document, without re-validating them."""
+    full_story = story_doc.get("full_story")
+    if full_story is None:
+        full_story = full_story_view(story_doc.get("state") or {})
+    return {
+        "story_id": story_doc["story_id"],
+        "user_id": story_doc["user_id"],
+        "full_story": full_story,
+        "created_at": story_doc["created_at"],
+        "updated_at": story_doc["updated_at"],
+    }
@@ -1,3 +1,4 @@
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, END
 from src.stories.nodes.outline_node import outline_node
 from src.stories.nodes.character_node import character_node
@@ -7,22 +8,30 @@ from src.stories.nodes_continue.extend_plot_node import extend_plot_node
 from src.stories.nodes_continue.develop_character_node import develop_character_node
 from src.stories.nodes_continue.append_scene_node import append_scene_node
 from src.database.models import StoryStateModel
+from src.metrics import node_duration
 
-def node_with_history(node_func, story_history):
-    async def wrapped_node(state):
-        return await node_func(state, story_history)
+# The per-request history list travels in the run config, so the compiled
+# graphs below can be shared by every request.
+def history_config(story_history: list) -> dict:
+    return {"configurable": {"story_history": story_history}}
+
+def node_with_history(node_func):
+    async def wrapped_node(state, config: RunnableConfig):
+        story_history = config["configurable"]["story_history"]
+        with node_duration.time(node=node_func.__name__):
+            return await node_func(state, story_history)
     return wrapped_node
 
 # ---------------------------
 # Workflow for NEW stories
 # ---------------------------
-def create_workflow(story_history):
+def create_workflow():
     graph = StateGraph(StoryStateModel)
 
     # Wrap nodes with history
-    graph.add_node("outline_node", node_with_history(outline_node, story_history))
-    graph.add_node("character_node", node_with_history(character_node, story_history))
-    graph.add_node("scene_node", node_with_history(scene_node, story_history))
+    graph.add_node("outline_node", node_with_history(outline_node))
+    graph.add_node("character_node", node_with_history(character_node))
+    graph.add_node("scene_node", node_with_history(scene_node))
 
     # Entry point
     graph.set_entry_point("outline_node")
@@ -38,14 +47,15 @@ def create_workflow(story_history):
 # ---------------------------
 # Workflow for CONTINUATION
 # ---------------------------
-def create_continuation_workflow(story_history):
+def create_continuation_workflow():
     graph = StateGraph(StoryStateModel)
 
-    graph.add_node("continuation_router_node", node_with_history(continuation_router_node, story_history))
-    graph.add_node("extend_plot_node", node_with_history(extend_plot_node, story_history))
-    graph.add_node("develop_character_node", node_with_history(develop_character_node, story_history))
-    graph.add_node("append_scene_node", node_with_history(append_scene_node, story_history))
+    graph.add_node("continuation_router_node", node_with_history(continuation_router_node))
+    graph.add_node("extend_plot_node", node_with_history(extend_plot_node))
+    graph.add_node("develop_character_node", node_with_history(develop_character_node))
+    graph.add_node("append_scene_node", node_with_history(append_scene_node))
 
+    # The router may pick several actions; independent ones run as parallel branches
     graph.add_conditional_edges(
         "continuation_router_node",
         continuation_router_condition,
@@ -56,8 +66,9 @@ def create_continuation_workflow(story_history):
         }
     )
 
-    graph.add_edge("extend_plot_node", END)
-    graph.add_edge("develop_character_node", END)
+    # Branches join into a single append_scene_node run on the merged state
+    graph.add_edge("extend_plot_node", "append_scene_node")
+    graph.add_edge("develop_character_node", "append_scene_node")
     graph.add_edge("append_scene_node", END)
 
     graph.set_entry_point("continuation_router_node")
@@ -68,8 +79,14 @@ def create_continuation_workflow(story_history):
 # ---------------------------
 # Safe router condition
 # ---------------------------
-def continuation_router_condition(state: StoryStateModel) -> str:
-    if state.current_node: 
-        return state.current_node 
-    else:
-      return END
\ No newline at end of file
+def continuation_router_condition(state: StoryStateModel) -> list[str]:
+    # append_scene always runs last, after any other chosen branches have joined
+    branches = [action for action in state.actions if action in ("extend_plot", "develop_character")]
+    return branches or ["append_scene"]
+
+
+# ---------------------------
+# Compiled once per process
+# ---------------------------
+story_workflow = create_workflow()
+continuation_workflow = create_continuation_workflow()
@@ -0,0 +1,142 @@
+"""
+A small in-memory stand-in for the async MongoDB API, enough to exercise route
+logic (filters, sorting, paging, unique indexes) without a server.
+
+Supported: equality, $lt/$lte/$gt/$gte/$in/$exists and $or in filters; inclusion
+or exclusion projections; find().sort().limit(); find_one; insert_one/insert_many
+with unique keys; update_one with $set/$unset/$inc; delete_many.
+"""
+import copy
+import itertools
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+_ids = itertools.count(1)
+_MISSING = object()
+
+_OPERATORS = {
+    "$lt": lambda value, arg: value is not _MISSING and value < arg,
+    "$lte": lambda value, arg: value is not _MISSING and value <= arg,
+    "$gt": lambda value, arg: value is not _MISSING and value > arg,
+    "$gte": lambda value, arg: value is not _MISSING and value >= arg,
+    "$in": lambda value, arg: value in arg,
+    "$exists": lambda value, arg: (value is not _MISSING) == arg,
+}
+
+
+def matches(doc: dict, query: dict) -> bool:
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(matches(doc, branch) for branch in condition):
+                return False
+            continue
+        value = doc.get(key, _MISSING)
+        if isinstance(condition, dict) and condition and all(op.startswith("$") for op in condition):
+            if not all(_OPERATORS[op](value, arg) for op, arg in condition.items()):
+                return False
+        elif value != condition and not (condition is None and value is _MISSING):
+            return False
+    return True
+
+
+def project(doc: dict, projection) -> dict:
+    doc = copy.deepcopy(doc)
+    if not projection:
+        return doc
+    include_id = projection.get("_id", 1)
+    fields = {key: value for key, value in projection.items() if key != "_id"}
+    if fields and all(fields.values()):
+        doc = {key: value for key, value in doc.items() if key in fields or key == "_id"}
+    else:
+        for key in fields:
+            doc.pop(key, None)
+    if not include_id:
+        doc.pop("_id", None)
+    return doc
+
+
+class FakeCursor:
+    def __init__(self, docs: list):
+        self._docs = docs
+
+    def sort(self, key, direction=1):
+        keys = [(key, direction)] if isinstance(key, str) else list(key)
+        for field, field_direction in reversed(keys):
+            self._docs.sort(key=lambda doc: doc.get(field), reverse=field_direction == -1)
+        return self
+
+    def limit(self, count: int):
+        self._docs = self._docs[:count]
+        return self
+
+    def __aiter__(self):
+        self._iter = iter(self._docs)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class FakeCollection:
+    def __init__(self, unique=()):
+        self.docs = []
+        self.unique = [tuple(keys) for keys in unique]
+
+    def _duplicate(self, doc: dict) -> bool:
+        return any(
+            all(other.get(key) == doc.get(key) for key in keys)
+            for keys in self.unique for other in self.docs
+        )
+
+    async def insert_one(self, doc: dict):
+        if self._duplicate(doc):
+            raise DuplicateKeyError("E11000 duplicate key error")
+        doc.setdefault("_id", next(_ids))
+        self.docs.append(copy.deepcopy(doc))
+
+    async def insert_many(self, docs: list, ordered: bool = True):
+        errors = []
+        for index, doc in enumerate(docs):
+            try:
+                await self.insert_one(doc)
+            except DuplicateKeyError as e:
+                errors.append({"index": index, "code": 11000, "errmsg": str(e)})
+                if ordered:
+                    break
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(docs) - len(errors)})
+
+    def find(self, query: dict = None, projection=None) -> FakeCursor:
+        return FakeCursor([project(doc, projection) for doc in self.docs if matches(doc, query or {})])
+
+    async def find_one(self, query: dict = None, projection=None):
+        for doc in self.docs:
+            if matches(doc, query or {}):
+                return project(doc, projection)
+        return None
+
+    async def update_one(self, query: dict, update: dict):
+        for doc in self.docs:
+            if matches(doc, query):
+                doc.update(copy.deepcopy(update.get("$set", {})))
+                for key in update.get("$unset", {}):
+                    doc.pop(key, None)
+                for key, amount in update.get("$inc", {}).items():
+                    doc[key] = doc.get(key, 0) + amount
+                return
+
+    async def delete_many(self, query: dict):
+        self.docs = [doc for doc in self.docs if not matches(doc, query)]
+
+
+class FakeDB:
+    def __init__(self, unique: dict = None):
+        self._unique = unique or {}
+        self._collections = {}
+
+    def __getitem__(self, name: str) -> FakeCollection:
+        if name not in self._collections:
+            self._collections[name] = FakeCollection(self._unique.get(name, ()))
+        return self._collections[name]
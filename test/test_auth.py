@@ -135,4 +135,71 @@ async def test_refresh_token_contains_user_info():
     assert payload["sub"]==user["user_id"]
     assert payload["username"]=="grace"
     assert payload["email"]=="grace@gmail.com"
-    assert "exp" in payload
\ No newline at end of file
+    assert "exp" in payload
+
+# ---- Current user cache (no MongoDB needed) ----
+def make_token(user_id="cached_user", username="ivy", email="ivy@gmail.com"):
+    from src.auth.models import UserSchema
+    user = UserSchema(user_id=user_id, username=username, email=email, hashed_password="hash")
+    return router_auth.create_access_token(user), user
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_is_cached_after_first_lookup():
+    from unittest.mock import AsyncMock, MagicMock
+    from src.auth.user_cache import clear_user_cache, invalidate_user
+
+    clear_user_cache()
+    token, user = make_token()
+    users = MagicMock()
+    users.find_one = AsyncMock(return_value=user.model_dump())
+    db = {"users": users}
+
+    first = await router_auth.get_current_user(token=token, db=db)
+    second = await router_auth.get_current_user(token=token, db=db)
+
+    assert first.username == second.username == "ivy"
+    assert second.hashed_password == ""      # the hash is never cached
+    assert users.find_one.await_count == 1
+
+    invalidate_user(user.user_id)
+    await router_auth.get_current_user(token=token, db=db)
+    assert users.find_one.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_stateless_mode_skips_lookup():
+    from unittest.mock import patch, MagicMock
+
+    token, user = make_token(user_id="stateless_user")
+    db = MagicMock()
+
+    with patch("src.endpoints.router_auth.AUTH_STATELESS", True):
+        current_user = await router_auth.get_current_user(token=token, db=db)
+
+    assert current_user.user_id == "stateless_user"
+    assert current_user.email == "ivy@gmail.com"
+    db.__getitem__.assert_not_called()
+
+
+# ---- Password hashing in the thread pool (no MongoDB needed) ----
+@pytest.mark.asyncio
+async def test_hashing_round_trip_runs_in_the_pool():
+    from src.auth.hashing import hash_password, verify_password, hashing_stats
+
+    completed = hashing_stats()["completed"]
+    hashed = await hash_password("secret12")
+
+    assert hashed != "secret12" and hashed.startswith("$2")
+    assert await verify_password("secret12", hashed) is True
+    assert hashing_stats()["completed"] == completed + 2
+    assert hashing_stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_hashing_rejects_a_wrong_password():
+    from src.auth.hashing import hash_password, verify_password
+
+    hashed = await hash_password("secret12")
+
+    assert await verify_password("secret13", hashed) is False
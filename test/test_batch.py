@@ -0,0 +1,40 @@
+import json
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from src.database.history import HISTORY_COLLECTION
+from src.database.models import StoryBatchCreate, StoryCreate
+from src.endpoints import router
+from .fake_db import FakeDB
+
+USER = SimpleNamespace(user_id="u", username="ada")
+
+
+@pytest.mark.asyncio
+async def test_batch_reports_failed_generation_and_duplicate_insert_per_item():
+    db = FakeDB(unique={"stories": [("story_id",)], HISTORY_COLLECTION: [("story_id", "seq")]})
+    await db["stories"].insert_one({"story_id": "taken", "user_id": "someone-else"})
+
+    async def generate(state, config):
+        if state.prompt == "broken":
+            raise ValueError("upstream failed")
+        return {"prompt": state.prompt, "outline": ["Event"], "scenes": ["Scene"]}
+
+    request = StoryBatchCreate(stories=[StoryCreate(prompt="first"), StoryCreate(prompt="broken"), StoryCreate(prompt="third")])
+    # The third story is given an id that already exists, so its insert fails
+    ids = MagicMock(uuid4=MagicMock(side_effect=["new-0", "taken"]))
+    with patch("src.endpoints.router.story_workflow", MagicMock(ainvoke=AsyncMock(side_effect=generate))), \
+         patch("src.endpoints.router.uuid", ids):
+        response = await router.create_stories_batch(request, db=db, current_user=USER)
+
+    body = json.loads(response.body)
+    assert (body["created"], body["failed"]) == (1, 2)
+    assert [result["status"] for result in body["results"]] == ["created", "failed", "failed"]
+    assert [result["index"] for result in body["results"]] == [0, 1, 2]
+    assert body["results"][0]["story"]["story_id"] == "new-0"
+    assert body["results"][1]["error"] == "upstream failed"
+    assert "duplicate key" in body["results"][2]["error"]
+
+    # Only the created story gets its first turn written
+    assert [(turn["story_id"], turn["seq"]) for turn in db[HISTORY_COLLECTION].docs] == [("new-0", 0)]
+    assert (await db["stories"].find_one({"story_id": "taken"}))["user_id"] == "someone-else"
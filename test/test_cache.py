@@ -0,0 +1,128 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+from src.cache import LRUCache
+from src.stories.llm_cache import LLMCache, cache_key
+from src.stories.singleflight import SingleFlight
+from src.stories import utils
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingLLM:
+    model = "fake-model"
+
+    def __init__(self, text):
+        self.text = text
+        self.calls = 0
+
+    async def astream(self, messages):
+        self.calls += 1
+        yield type("Chunk", (), {"content": self.text})()
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")          # "b" is now the least recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_lru_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = LRUCache(max_entries=10, ttl_seconds=5, clock=clock)
+    cache.set("a", 1)
+
+    clock.now = 4
+    assert cache.get("a") == 1
+    clock.now = 6
+    assert cache.get("a") is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["expirations"] == 1
+
+
+def test_cache_key_depends_on_model_system_and_prompt():
+    base = cache_key("model", "system", "prompt")
+    assert base == cache_key("model", "system", "prompt")
+    assert base != cache_key("other-model", "system", "prompt")
+    assert base != cache_key("model", "other system", "prompt")
+    assert base != cache_key("model", "system", "other prompt")
+
+
+@pytest.mark.asyncio
+async def test_call_llm_serves_repeated_prompts_from_cache():
+    model = CountingLLM("A cached outline")
+    messages = [{"role": "system", "content": "planner"}, {"role": "user", "content": "A dragon"}]
+
+    with patch("src.stories.utils.llm_cache", new=LLMCache(max_entries=8, ttl_seconds=60)) as cache:
+        first = await utils.call_llm(messages, model=model)
+        second = await utils.call_llm(messages, model=model)
+
+    assert first == second == "A cached outline"
+    assert model.calls == 1
+    assert cache.stats()["memory"]["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_disabled_cache_always_calls_model():
+    model = CountingLLM("Fresh text")
+    messages = [{"role": "user", "content": "A dragon"}]
+
+    with patch("src.stories.utils.llm_cache", new=LLMCache(enabled=False)):
+        await utils.call_llm(messages, model=model)
+        await utils.call_llm(messages, model=model)
+
+    assert model.calls == 2
+
+
+class SlowLLM(CountingLLM):
+    async def astream(self, messages):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        yield type("Chunk", (), {"content": self.text})()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_calls_share_one_request():
+    model = SlowLLM("Shared scene")
+    histories = [[], [], []]
+
+    with patch("src.stories.utils.get_llm", return_value=model), \
+         patch("src.stories.utils.llm_cache", new=LLMCache(enabled=False)):
+        results = await asyncio.gather(*(
+            utils.run_llm("Same prompt", "Same system", history) for history in histories
+        ))
+
+    assert results == ["Shared scene"] * 3
+    assert model.calls == 1
+    # Every caller still records the reply in its own history
+    assert all(history == [{"role": "assistant", "content": "Shared scene"}] for history in histories)
+
+
+@pytest.mark.asyncio
+async def test_singleflight_propagates_errors_and_forgets_key():
+    flight = SingleFlight()
+
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream failed")
+
+    results = await asyncio.gather(flight.do("k", boom), flight.do("k", boom), return_exceptions=True)
+
+    assert all(isinstance(r, ValueError) for r in results)
+    assert flight.stats() == {"in_flight": 0, "calls": 1, "coalesced": 1}
@@ -0,0 +1,69 @@
+import pytest
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from fastapi import HTTPException
+from src.database.history import HISTORY_COLLECTION, append_turn, get_turns, migrate_legacy_history
+from src.endpoints import router
+from .fake_db import FakeDB
+
+USER = SimpleNamespace(user_id="u", username="ada")
+
+
+def history_db() -> FakeDB:
+    return FakeDB(unique={HISTORY_COLLECTION: [("story_id", "seq")]})
+
+
+def message(n: int) -> list:
+    return [{"role": "user", "content": f"turn {n}"}]
+
+
+@pytest.mark.asyncio
+async def test_turns_are_returned_in_seq_order_and_paged_with_after():
+    db = history_db()
+    for seq in (2, 0, 4, 1, 3):
+        await append_turn(db, "s", seq, message(seq))
+    await append_turn(db, "other", 0, message(0))
+
+    pages, after = [], -1
+    while True:
+        turns = await get_turns(db, "s", after_seq=after, limit=2)
+        pages.append([turn["seq"] for turn in turns])
+        if len(turns) < 2:
+            break
+        after = turns[-1]["seq"]
+
+    assert pages == [[0, 1], [2, 3], [4]]
+
+
+@pytest.mark.asyncio
+async def test_history_route_migrates_legacy_story_and_pages():
+    db = history_db()
+    legacy_history = [{"role": "user", "content": "A dragon"}, {"role": "assistant", "content": "Outline"}]
+    await db["stories"].insert_one({"story_id": "s", "user_id": "u", "history": legacy_history,
+                                    "created_at": datetime.now(timezone.utc)})
+
+    first = await router.get_story_history("s", after=-1, limit=1, db=db, current_user=USER)
+    await append_turn(db, "s", 1, message(1))
+    second = await router.get_story_history("s", after=first["next_after"], limit=1, db=db, current_user=USER)
+
+    story = await db["stories"].find_one({"story_id": "s"})
+    assert first["turns"][0]["messages"] == legacy_history and first["next_after"] == 0
+    assert [turn["seq"] for turn in second["turns"]] == [1]
+    assert story["turns"] == 1 and "history" not in story
+    with pytest.raises(HTTPException):
+        await router.get_story_history("missing", after=-1, limit=1, db=db, current_user=USER)
+
+
+@pytest.mark.asyncio
+async def test_migration_tolerates_a_concurrent_migration():
+    db = history_db()
+    legacy_history = [{"role": "user", "content": "A dragon"}]
+    await db["stories"].insert_one({"story_id": "s", "user_id": "u", "history": legacy_history})
+    # Another request already wrote turn 0 but has not updated the story yet
+    await append_turn(db, "s", 0, legacy_history)
+
+    assert await migrate_legacy_history(db, {"story_id": "s"}) == 1
+    assert await migrate_legacy_history(db, {"story_id": "s"}) == 1
+
+    assert [turn["seq"] for turn in await get_turns(db, "s")] == [0]
+    assert (await db["stories"].find_one({"story_id": "s"}))["turns"] == 1
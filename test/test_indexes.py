@@ -0,0 +1,76 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from src.database.indexes import INDEXES, ROUTE_QUERIES, _plan_stages, verify_query_plans
+
+FETCH_OVER_IXSCAN = {
+    "stage": "FETCH",
+    "inputStage": {"stage": "IXSCAN", "keyPattern": {"story_id": 1}, "indexName": "story_id_unique"},
+}
+SORT_OVER_COLLSCAN = {
+    "stage": "SORT",
+    "sortPattern": {"updated_at": -1},
+    "inputStage": {"stage": "COLLSCAN", "filter": {"user_id": {"$eq": "u"}}},
+}
+# Newer servers wrap the classic tree in queryPlan, and $or plans list several inputs
+SBE_OR_PLAN = {
+    "queryPlan": {
+        "stage": "FETCH",
+        "inputStage": {"stage": "OR", "inputStages": [
+            {"stage": "IXSCAN", "indexName": "user_updated_story"},
+            {"stage": "IXSCAN", "indexName": "user_updated_story"},
+        ]},
+    },
+    "slotBasedPlan": {"slots": "..."},
+}
+
+
+def test_plan_stages_walks_nested_explain_output():
+    assert _plan_stages(FETCH_OVER_IXSCAN) == ["FETCH", "IXSCAN"]
+    assert _plan_stages(SORT_OVER_COLLSCAN) == ["SORT", "COLLSCAN"]
+    assert _plan_stages(SBE_OR_PLAN) == ["FETCH", "OR", "IXSCAN", "IXSCAN"]
+
+
+@pytest.mark.asyncio
+async def test_verify_query_plans_reports_only_queries_without_an_index():
+    async def explain(command, find, verbosity):
+        plan = SORT_OVER_COLLSCAN if find["find"] == "users" else FETCH_OVER_IXSCAN
+        return {"queryPlanner": {"winningPlan": plan}}
+
+    db = MagicMock(command=AsyncMock(side_effect=explain))
+
+    failures = await verify_query_plans(db)
+
+    users_routes = {route for route, (collection, _, _) in ROUTE_QUERIES.items() if collection == "users"}
+    assert set(failures) == users_routes
+    assert all(stages == ["SORT", "COLLSCAN"] for stages in failures.values())
+
+
+def covering_index(collection: str, query_filter: dict, sort):
+    """Name of an index whose leading keys are the filter's equality fields followed by the sort keys."""
+    equality = {key for key, value in query_filter.items() if not key.startswith("$") and not isinstance(value, dict)}
+    for index in INDEXES[collection]:
+        keys = list(index.document["key"].items())
+        prefix = 0
+        while prefix < len(keys) and keys[prefix][0] in equality:
+            prefix += 1
+        if prefix == 0:
+            continue
+        if sort:
+            following = keys[prefix:prefix + len(sort)]
+            directions = {direction * index_direction
+                          for (key, direction), (index_key, index_direction) in zip(sort.items(), following)
+                          if key == index_key}
+            # Every sort key must follow in order, scanned all forwards or all backwards
+            if len(following) != len(sort) or len(directions) != 1 or any(
+                key != index_key for key, (index_key, _) in zip(sort, following)
+            ):
+                continue
+        return index.document["name"]
+    return None
+
+
+@pytest.mark.parametrize("route", list(ROUTE_QUERIES))
+def test_declared_indexes_cover_route_queries(route):
+    collection, query_filter, sort = ROUTE_QUERIES[route]
+
+    assert covering_index(collection, query_filter, sort) is not None
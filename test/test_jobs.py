@@ -0,0 +1,167 @@
+import asyncio
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+from src.stories.jobs import InMemoryJobQueue, JobQueue, JobWorkerPool, MongoJobQueue
+
+
+async def wait_for(queue, job_id, timeout=1.0):
+    for _ in range(int(timeout / 0.01)):
+        job = await queue.get(job_id)
+        if job.status in ("succeeded", "failed"):
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError("job did not finish")
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_runs_jobs_and_records_progress():
+    pool = JobWorkerPool(InMemoryJobQueue(), workers=2)
+
+    async def handler(job, report_progress):
+        for node in ("outline_node", "character_node", "scene_node"):
+            await report_progress(node)
+        return {"story_id": job.payload["story_id"]}
+
+    async def failing(job, report_progress):
+        raise ValueError("upstream failed")
+
+    pool.register("create", handler)
+    pool.register("broken", failing)
+    pool.start()
+    try:
+        ok = await pool.submit("create", "user-1", "A dragon", story_id="s1")
+        bad = await pool.submit("broken", "user-1", "A dragon", story_id="s2")
+        ok_job = await wait_for(pool.queue, ok.job_id)
+        bad_job = await wait_for(pool.queue, bad.job_id)
+    finally:
+        await pool.stop()
+
+    assert ok_job.status == "succeeded"
+    assert ok_job.progress == ["outline_node", "character_node", "scene_node"]
+    assert ok_job.result == {"story_id": "s1"}
+    assert bad_job.status == "failed"
+    assert bad_job.error == "upstream failed"
+
+
+@pytest.mark.asyncio
+async def test_stop_lets_running_jobs_finish_within_the_drain_timeout():
+    pool = JobWorkerPool(InMemoryJobQueue(), workers=2)
+    started = asyncio.Event()
+
+    async def slow(job, report_progress):
+        started.set()
+        await asyncio.sleep(0.05)
+        return {"story_id": job.payload["story_id"]}
+
+    pool.register("create", slow)
+    pool.start()
+    job = await pool.submit("create", "user-1", "A dragon", story_id="s1")
+    await started.wait()
+
+    await pool.stop(drain_timeout=1)
+
+    assert (await pool.queue.get(job.job_id)).status == "succeeded"
+
+
+@pytest.mark.asyncio
+async def test_stop_claiming_finishes_the_running_job_and_leaves_new_ones_queued():
+    pool = JobWorkerPool(InMemoryJobQueue(), workers=2)
+    started = asyncio.Event()
+
+    async def slow(job, report_progress):
+        started.set()
+        await asyncio.sleep(0.05)
+        return {}
+
+    pool.register("create", slow)
+    pool.start()
+    running = await pool.submit("create", "user-1", "A dragon", story_id="s1")
+    await started.wait()
+
+    pool.stop_claiming()
+    waiting = await pool.submit("create", "user-1", "A dragon", story_id="s2")
+    await pool.stop(drain_timeout=1)
+
+    assert (await pool.queue.get(running.job_id)).status == "succeeded"
+    assert (await pool.queue.get(waiting.job_id)).status == "queued"
+
+
+@pytest.mark.asyncio
+async def test_job_outliving_the_drain_timeout_is_marked_failed():
+    pool = JobWorkerPool(InMemoryJobQueue(), workers=1)
+    started = asyncio.Event()
+
+    async def endless(job, report_progress):
+        started.set()
+        await asyncio.sleep(60)
+
+    pool.register("create", endless)
+    pool.start()
+    job = await pool.submit("create", "user-1", "A dragon", story_id="s1")
+    await started.wait()
+
+    await pool.stop(drain_timeout=0.01)
+
+    stopped = await pool.queue.get(job.job_id)
+    assert stopped.status == "failed"
+    assert "shutdown" in stopped.error
+
+
+class FlakyQueue(InMemoryJobQueue):
+    """Fails the first claim, as a MongoDB network blip would."""
+
+    def __init__(self):
+        super().__init__()
+        self.claim_errors = 1
+
+    async def claim(self):
+        if self.claim_errors:
+            self.claim_errors -= 1
+            raise ConnectionError("network blip")
+        return await super().claim()
+
+
+@pytest.mark.asyncio
+async def test_worker_survives_a_failed_claim(monkeypatch):
+    monkeypatch.setattr("src.stories.jobs.CLAIM_RETRY_BASE_SECONDS", 0.01)
+    pool = JobWorkerPool(FlakyQueue(), workers=1)
+
+    async def handler(job, report_progress):
+        return {"ok": True}
+
+    pool.register("create", handler)
+    pool.start()
+    try:
+        job = await pool.submit("create", "user-1", "A dragon", story_id="s1")
+        done = await wait_for(pool.queue, job.job_id)
+    finally:
+        await pool.stop()
+
+    assert done.status == "succeeded"
+    assert done.attempts == 1
+
+
+@pytest.mark.asyncio
+async def test_mongo_claim_reclaims_running_jobs_whose_lease_expired():
+    queue = MongoJobQueue(lease_seconds=60, max_attempts=3)
+    doc = {"job_id": "j1", "kind": "create", "user_id": "u", "prompt": "p", "status": "running", "attempts": 2,
+           "created_at": datetime.now(timezone.utc), "updated_at": datetime.now(timezone.utc)}
+    collection = MagicMock(find_one_and_update=AsyncMock(return_value=doc))
+
+    with patch.object(queue, "_collection", new=AsyncMock(return_value=collection)):
+        job = await queue.claim()
+
+    assert job.job_id == "j1"
+    query, update = collection.find_one_and_update.call_args[0]
+    stale = query["$or"][1]
+    assert stale["status"] == "running"
+    assert stale["attempts"] == {"$not": {"$gte": 3}}
+    assert datetime.now(timezone.utc) - stale["updated_at"]["$lt"] >= timedelta(seconds=60)
+    assert update["$inc"] == {"attempts": 1}
+    assert "claimed_at" in update["$set"]
+
+
+def test_job_queue_is_abstract():
+    with pytest.raises(TypeError):
+        JobQueue()
@@ -0,0 +1,21 @@
+import asyncio
+import os
+import signal
+import pytest
+from src.lifecycle import on_shutdown_signal
+
+
+@pytest.mark.asyncio
+async def test_shutdown_signal_runs_callback_and_the_servers_handler():
+    server_calls, callback_calls = [], []
+    original = signal.signal(signal.SIGTERM, lambda signum, frame: server_calls.append(signum))
+    try:
+        restore = on_shutdown_signal(lambda: callback_calls.append(True))
+        os.kill(os.getpid(), signal.SIGTERM)
+        await asyncio.sleep(0.01)
+        restore()
+    finally:
+        signal.signal(signal.SIGTERM, original)
+
+    assert server_calls == [signal.SIGTERM]
+    assert callback_calls == [True]
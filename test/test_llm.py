@@ -0,0 +1,72 @@
+import json
+import os
+import subprocess
+import sys
+import pytest
+from src.llm.fake import FakeChatModel, FakeLLMError, OUTLINE_TEXT
+from src.llm.providers import get_llm, register_provider
+from src.stories.nodes.character_node import character_node
+from src.database.models import StoryStateModel
+
+
+def fake_model(**kwargs):
+    return FakeChatModel(latency_distribution="constant", latency_ms=0, tokens_per_second=0, seed=1, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_fake_model_replies_are_deterministic():
+    messages = [{"role": "user", "content": "Create a high-level plot outline for: a heist"}]
+
+    first = await fake_model().ainvoke(messages)
+    second = await fake_model().ainvoke(messages)
+
+    assert first.content == second.content == OUTLINE_TEXT
+
+
+@pytest.mark.asyncio
+async def test_fake_model_streams_tokens():
+    messages = [{"role": "user", "content": "Return the characters as a JSON list"}]
+
+    chunks = [chunk.content async for chunk in fake_model().astream(messages)]
+
+    assert len(chunks) > 1
+    assert isinstance(json.loads("".join(chunks)), list)
+
+
+@pytest.mark.asyncio
+async def test_fake_model_injects_errors():
+    with pytest.raises(FakeLLMError) as exc:
+        await fake_model(error_rate=1.0, error_status=429).ainvoke([{"role": "user", "content": "hi"}])
+
+    assert exc.value.status_code == 429
+
+
+def test_get_llm_uses_registered_provider():
+    register_provider("test-fake", fake_model)
+
+    model = get_llm("test-fake")
+
+    assert isinstance(model, FakeChatModel)
+    assert get_llm("test-fake") is model
+    with pytest.raises(ValueError):
+        get_llm("missing")
+
+
+def test_importing_the_app_does_not_load_the_gemini_sdk():
+    code = "import sys, src.main; print('langchain_google_genai' in sys.modules)"
+    env = {**os.environ, "GOOGLE_API_KEY": os.environ.get("GOOGLE_API_KEY", "test")}
+
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True)
+
+    assert completed.stdout.strip().splitlines()[-1] == "False"
+
+
+@pytest.mark.asyncio
+async def test_character_node_with_fake_provider(monkeypatch):
+    register_provider("test-fake", fake_model)
+    monkeypatch.setattr("src.stories.utils.get_llm", lambda: get_llm("test-fake"))
+    state = StoryStateModel(prompt="A heist in a drowned city", outline=OUTLINE_TEXT.split("\n"))
+
+    result = await character_node(state, story_history=[])
+
+    assert [c["name"] for c in result.characters] == ["Mara Voss", "Ilan Reyes", "The Warden"]
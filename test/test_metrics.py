@@ -0,0 +1,90 @@
+import pytest
+from unittest.mock import patch
+from src import metrics
+from src.metrics import Counter, Histogram, render
+from src.stories.nodes_continue.continuation_router_node import parse_actions
+from src.stories.utils import call_llm
+from src.llm.fake import FakeChatModel
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("test_latency_seconds", "Test histogram.", ["route"], buckets=(0.1, 1))
+    histogram.observe(0.05, route="a")
+    histogram.observe(0.5, route="a")
+    histogram.observe(5, route="a")
+
+    text = render()
+
+    assert '# TYPE test_latency_seconds histogram' in text
+    assert 'test_latency_seconds_bucket{route="a",le="0.1"} 1' in text
+    assert 'test_latency_seconds_bucket{route="a",le="1.0"} 2' in text
+    assert 'test_latency_seconds_bucket{route="a",le="+Inf"} 3' in text
+    assert 'test_latency_seconds_count{route="a"} 3' in text
+
+
+def test_counter_rejects_wrong_labels():
+    counter = Counter("test_events_total", "Test counter.", ["kind"])
+    counter.inc(kind="x")
+
+    assert counter.value(kind="x") == 1
+    with pytest.raises(ValueError):
+        counter.inc(other="x")
+
+
+def test_stats_are_exported_as_gauges():
+    metrics.register_stats("test_pool", lambda: {"workers": 2, "enabled": True, "memory": {"hits": 3}, "name": "x"}, "Test.")
+
+    text = render()
+
+    assert "test_pool_workers 2" in text
+    assert "test_pool_enabled 1" in text
+    assert "test_pool_memory_hits 3" in text
+    assert "test_pool_name" not in text
+
+
+def test_unknown_router_output_is_counted():
+    before = metrics.router_unknown_outputs.value()
+
+    parse_actions("I am not sure")
+    parse_actions("append_scene")
+
+    assert metrics.router_unknown_outputs.value() == before + 1
+
+
+@pytest.mark.asyncio
+async def test_call_llm_records_latency_and_sizes():
+    model = FakeChatModel(latency_distribution="constant", latency_ms=0, tokens_per_second=0)
+    model.model = "metrics-test"
+    before = metrics.llm_call_duration.count(model="metrics-test", source="upstream")
+
+    with patch("src.stories.utils.llm_cache.enabled", False):
+        await call_llm([{"role": "user", "content": "Write the next scene"}], model=model)
+
+    assert metrics.llm_call_duration.count(model="metrics-test", source="upstream") == before + 1
+    assert metrics.llm_prompt_chars.count(model="metrics-test") >= 1
+    assert metrics.llm_completion_chars.count(model="metrics-test") >= 1
+
+
+def test_mongo_listener_labels_commands_with_their_collection():
+    from types import SimpleNamespace
+    from src.database.monitoring import MongoCommandMetrics
+    from src.metrics import mongo_command_duration
+
+    listener = MongoCommandMetrics()
+    commands = [
+        ("find", {"find": "stories", "filter": {}}),
+        ("getMore", {"getMore": 8135642371, "collection": "stories"}),   # the first field is the cursor id
+        ("explain", {"explain": {"find": "jobs"}, "verbosity": "queryPlanner"}),
+    ]
+    before = {command: mongo_command_duration.count(collection=collection, command=command)
+              for command, collection in [("find", "stories"), ("getMore", "stories"), ("explain", "jobs")]}
+
+    for request_id, (name, command) in enumerate(commands):
+        event = SimpleNamespace(command_name=name, command=command, connection_id=("db", 27017), request_id=request_id)
+        listener.started(event)
+        listener.succeeded(SimpleNamespace(connection_id=("db", 27017), request_id=request_id, duration_micros=1500))
+
+    assert mongo_command_duration.count(collection="stories", command="find") == before["find"] + 1
+    assert mongo_command_duration.count(collection="stories", command="getMore") == before["getMore"] + 1
+    assert mongo_command_duration.count(collection="jobs", command="explain") == before["explain"] + 1
+    assert listener._pending == {}
@@ -69,3 +69,234 @@ async def test_append_scene_node():
     new_state = await append_scene_node(state, history)
     assert len(new_state.scenes) == 2
     assert history[-1]["role"] == "assistant"
+
+
+@pytest.mark.asyncio
+async def test_compiled_workflow_uses_history_from_config():
+    from src.stories.workflow import story_workflow, history_config
+
+    fake_characters = '[{"name": "Alice", "background": "Scientist", "motivations": "Curiosity", "role": "Lead"}]'
+
+    async def fake_run_llm(prompt_text, system_instruction, story_history, **kwargs):
+        text = fake_characters if "character designer" in system_instruction else "Line one\nLine two"
+        story_history.append({"role": "assistant", "content": text})
+        return text
+
+    first_history, second_history = [], []
+    with patch("src.stories.nodes.outline_node.run_llm", new=fake_run_llm), \
+         patch("src.stories.nodes.character_node.run_llm", new=fake_run_llm), \
+         patch("src.stories.nodes.scene_node.run_llm", new=fake_run_llm):
+        await story_workflow.ainvoke(StoryStateModel(prompt="First"), config=history_config(first_history))
+        final = await story_workflow.ainvoke(StoryStateModel(prompt="Second"), config=history_config(second_history))
+
+    # Each run appends only to its own history list
+    assert len(first_history) == 3
+    assert len(second_history) == 3
+    assert final["characters"][0]["name"] == "Alice"
+
+
+class FakeStreamingLLM:
+    """Stands in for the chat model; yields a fixed completion word by word."""
+    def __init__(self, text):
+        self.text = text
+
+    async def astream(self, messages):
+        for word in self.text.split(" "):
+            yield type("Chunk", (), {"content": word + " "})()
+
+
+@pytest.mark.asyncio
+async def test_workflow_streams_scene_tokens():
+    from src.stories.workflow import story_workflow, history_config
+
+    async def fake_run_llm(prompt_text, system_instruction, story_history, **kwargs):
+        return "[]" if "character designer" in system_instruction else "Outline point"
+
+    history = []
+    events = []
+    with patch("src.stories.nodes.outline_node.run_llm", new=fake_run_llm), \
+         patch("src.stories.nodes.character_node.run_llm", new=fake_run_llm), \
+         patch("src.stories.utils.get_llm", return_value=FakeStreamingLLM("The lab was quiet")):
+        async for mode, chunk in story_workflow.astream(
+            StoryStateModel(prompt="A quiet lab"),
+            config=history_config(history),
+            stream_mode=["updates", "custom"],
+        ):
+            events.append((mode, chunk))
+
+    tokens = [chunk["token"] for mode, chunk in events if mode == "custom"]
+    nodes = [next(iter(chunk)) for mode, chunk in events if mode == "updates"]
+    assert "".join(tokens).strip() == "The lab was quiet"
+    assert all(chunk["node"] == "scene_node" for mode, chunk in events if mode == "custom")
+    assert nodes == ["outline_node", "character_node", "scene_node"]
+
+
+@pytest.mark.asyncio
+async def test_character_node_parallel_mode_keeps_cast_order_and_retries():
+    state = StoryStateModel(prompt="A heist on Mars", outline=["Crew assembles", "Vault opens"])
+    history = []
+    attempts = {}
+
+    async def fake_run_llm(prompt_text, system_instruction, story_history, **kwargs):
+        if "List the 2–4 main characters" in prompt_text:
+            return '[{"name": "Ada", "role": "Pilot"}, {"name": "Rex", "role": "Thief"}, {"name": "Mo", "role": "Guard"}]'
+        name = prompt_text.split('character "')[1].split('"')[0]
+        attempts[name] = attempts.get(name, 0) + 1
+        if name == "Rex" and attempts[name] == 1:
+            return "not json"
+        return '{"name": "%s", "background": "From Mars", "motivations": "Gold"}' % name
+
+    with patch("src.stories.nodes.character_node.CHARACTER_GENERATION_MODE", "parallel"), \
+         patch("src.stories.nodes.character_node.run_llm", new=fake_run_llm):
+        new_state = await character_node(state, history)
+
+    assert [c["name"] for c in new_state.characters] == ["Ada", "Rex", "Mo"]
+    assert [c["role"] for c in new_state.characters] == ["Pilot", "Thief", "Guard"]
+    assert attempts == {"Ada": 1, "Rex": 2, "Mo": 1}
+
+
+@pytest.mark.asyncio
+async def test_character_node_parallel_mode_tolerates_malformed_cast_entries():
+    state = StoryStateModel(prompt="A heist on Mars", outline=["Crew assembles"])
+    prompts = []
+
+    async def fake_run_llm(prompt_text, system_instruction, story_history, **kwargs):
+        if "List the 2–4 main characters" in prompt_text:
+            return '[{"name": "Ada", "role": null}, {"name": 42, "role": "Thief"}, {"name": "Mo", "role": 7}]'
+        prompts.append(prompt_text)
+        return '{"background": "From Mars"}'
+
+    with patch("src.stories.nodes.character_node.CHARACTER_GENERATION_MODE", "parallel"), \
+         patch("src.stories.nodes.character_node.run_llm", new=fake_run_llm):
+        new_state = await character_node(state, [])
+
+    assert [(c["name"], c["role"]) for c in new_state.characters] == [("Ada", "No role specified."), ("Mo", "7")]
+    assert len(prompts) == 2
+
+
+def test_parse_actions_keeps_valid_actions_in_branch_order():
+    from src.stories.nodes_continue.continuation_router_node import parse_actions
+
+    assert parse_actions("develop_character, extend_plot") == ["extend_plot", "develop_character"]
+    assert parse_actions("'Append_Scene'") == ["append_scene"]
+    assert parse_actions("I am not sure") == ["append_scene"]
+
+
+@pytest.mark.asyncio
+async def test_continuation_runs_chosen_branches_then_one_scene():
+    from src.stories.workflow import continuation_workflow, history_config
+
+    calls = []
+
+    async def fake_call_llm(messages, **kwargs):
+        prompt = messages[-1]["content"]
+        if "analyzing a story update request" in prompt:
+            calls.append("router")
+            return "extend_plot, develop_character"
+        if prompt.startswith("Extend the plot outline"):
+            calls.append("extend_plot")
+            return "Event 1\nEvent 2\nEvent 3"
+        if prompt.startswith("Develop the character"):
+            calls.append("develop_character")
+            return "Now fears the dark."
+        calls.append("append_scene")
+        return "Alice lights a torch."
+
+    state = StoryStateModel(prompt="Alice finds a cave", outline=["Event 1", "Event 2"],
+                            characters=[{"name": "Alice", "background": "Explorer."}], scenes=["Opening"])
+    history = []
+    modules = ["continuation_router_node", "extend_plot_node", "develop_character_node", "append_scene_node"]
+    patches = [patch(f"src.stories.nodes_continue.{m}.call_llm", new=fake_call_llm) for m in modules]
+    for p in patches:
+        p.start()
+    try:
+        final = await continuation_workflow.ainvoke(state, config=history_config(history))
+    finally:
+        for p in patches:
+            p.stop()
+
+    assert calls[0] == "router"
+    assert sorted(calls[1:3]) == ["develop_character", "extend_plot"]
+    assert calls[3:] == ["append_scene"]
+    assert final["outline"] == ["Event 1", "Event 2", "Event 3"]
+    assert final["characters"][0]["background"] == "Explorer. Now fears the dark."
+    assert final["scenes"] == ["Opening", "Alice lights a torch."]
+    assert final["current_node"] == "done"
+    assert len(history) == 4
+
+
+@pytest.mark.asyncio
+async def test_summarize_folds_old_items_once_over_budget():
+    from src.stories.summary import needs_summary, summarize
+
+    outline = [f"Event {n}: " + "something happens. " * 20 for n in range(10)]
+    state = StoryStateModel(prompt="Go on", outline=outline, scenes=["Scene A " * 50, "Scene B " * 50])
+    assert needs_summary(state, budget=100)
+    assert not needs_summary(state, budget=100000)
+
+    with patch("src.stories.summary.call_llm", new=AsyncMock(return_value="Events 0-5 happened.")) as mock_llm:
+        result = await summarize(state)
+
+    prompt = mock_llm.call_args[0][0][0]["content"]
+    assert "Event 5" in prompt and "Event 6" not in prompt
+    assert "Scene A" in prompt and "Scene B" not in prompt
+    assert result == {"summary": "Events 0-5 happened.", "summarized_outline": 6, "summarized_scenes": 1}
+
+
+def test_normal_length_turn_does_not_summarize():
+    from src.stories.summary import needs_summary
+
+    # A typical story after a few turns: a dozen outline events and long scenes,
+    # which prompts never send in full (only the last scene is)
+    outline = [f"Event {n}: the crew argues about the map and sets off toward the harbour." for n in range(12)]
+    scenes = [" ".join(["word"] * 330) for _ in range(4)]
+    state = StoryStateModel(prompt="continue", outline=outline, scenes=scenes)
+
+    assert not needs_summary(state)
+
+
+@pytest.mark.asyncio
+async def test_extend_plot_sends_and_replaces_only_recent_events():
+    from src.stories.nodes_continue.extend_plot_node import extend_plot_node
+
+    state = StoryStateModel(prompt="A storm hits", outline=["Old 1", "Old 2", "Recent 1", "Recent 2"],
+                            summary="Long ago things happened.", summarized_outline=2)
+
+    with patch("src.stories.nodes_continue.extend_plot_node.call_llm",
+               new=AsyncMock(return_value="Recent 1\nRecent 2\nA storm hits")) as mock_llm:
+        result = await extend_plot_node(state, story_history=[])
+
+    prompt = mock_llm.call_args[0][0][0]["content"]
+    assert "Old 1" not in prompt and "Recent 1" in prompt
+    assert "Long ago things happened." in prompt
+    assert result["outline"] == ["Old 1", "Old 2", "Recent 1", "Recent 2", "A storm hits"]
+
+
+def test_router_classifier_answers_clear_inputs_and_defers_ambiguous_ones():
+    from src.stories.nodes_continue.router_classifier import classify_actions
+
+    assert classify_actions("continue") == ["append_scene"]
+    assert classify_actions("Suddenly pirates attack the ship") == ["extend_plot"]
+    assert classify_actions("Make Mara more afraid of water") == ["develop_character"]
+    assert classify_actions("The council reveals the secret and Ilan doubts himself") == ["extend_plot", "develop_character"]
+    assert classify_actions("something weird") is None
+
+
+@pytest.mark.asyncio
+async def test_router_skips_llm_when_classifier_is_confident():
+    from src.stories.nodes_continue.continuation_router_node import continuation_router_node
+
+    state = StoryStateModel(prompt="Suddenly pirates attack the ship", outline=["Event 1"])
+    with patch("src.stories.nodes_continue.continuation_router_node.call_llm", new=AsyncMock()) as mock_llm:
+        result = await continuation_router_node(state, story_history=[])
+
+    mock_llm.assert_not_called()
+    assert result.actions == ["extend_plot"]
+
+    state = StoryStateModel(prompt="something weird", outline=["Event 1"])
+    with patch("src.stories.nodes_continue.continuation_router_node.call_llm",
+               new=AsyncMock(return_value="  'Develop_Character.'  ")) as mock_llm:
+        result = await continuation_router_node(state, story_history=[])
+
+    mock_llm.assert_awaited_once()
+    assert result.actions == ["develop_character"]
@@ -0,0 +1,93 @@
+import asyncio
+import pytest
+from src.llm.fake import FakeLLMError
+from src.llm.scheduler import LLMScheduler, is_retryable
+from src.stories.utils import StreamInterruptedError
+
+
+@pytest.mark.asyncio
+async def test_scheduler_caps_concurrency():
+    scheduler = LLMScheduler(max_concurrency=2)
+    running, peak = 0, 0
+
+    async def call():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    await asyncio.gather(*(scheduler.run(call, user_id="u") for _ in range(6)))
+
+    assert peak == 2
+    assert scheduler.stats()["max_queue_depth"] == 4
+    assert scheduler.stats()["active"] == 0
+
+
+@pytest.mark.asyncio
+async def test_scheduler_interleaves_users():
+    scheduler = LLMScheduler(max_concurrency=1)
+    order = []
+    release = asyncio.Event()
+
+    async def blocker():
+        await release.wait()
+
+    def call(user):
+        async def fn():
+            order.append(user)
+        return fn
+
+    first = asyncio.create_task(scheduler.run(blocker, user_id="batch"))
+    await asyncio.sleep(0)
+    # A batch of calls from one user is queued before a single call from another
+    queued = [asyncio.create_task(scheduler.run(call("batch"), user_id="batch")) for _ in range(4)]
+    await asyncio.sleep(0)
+    queued.append(asyncio.create_task(scheduler.run(call("other"), user_id="other")))
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(first, *queued)
+
+    assert order.index("other") <= 1
+
+
+@pytest.mark.asyncio
+async def test_scheduler_retries_retryable_errors(monkeypatch):
+    scheduler = LLMScheduler(max_concurrency=1, max_retries=3, backoff_base=0.001, backoff_max=0.002)
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise FakeLLMError(429)
+        return "ok"
+
+    assert await scheduler.run(flaky) == "ok"
+    assert len(attempts) == 3
+    assert scheduler.stats()["retries"] == 2
+
+
+@pytest.mark.asyncio
+async def test_scheduler_does_not_retry_client_errors():
+    scheduler = LLMScheduler(max_concurrency=1, backoff_base=0.001)
+    attempts = []
+
+    async def bad_request():
+        attempts.append(1)
+        raise FakeLLMError(400)
+
+    with pytest.raises(FakeLLMError):
+        await scheduler.run(bad_request)
+    assert len(attempts) == 1
+    assert scheduler.stats()["failures"] == 1
+
+
+def test_interrupted_stream_is_not_retryable():
+    try:
+        try:
+            raise FakeLLMError(503)
+        except FakeLLMError as e:
+            raise StreamInterruptedError("stream failed") from e
+    except StreamInterruptedError as e:
+        assert not is_retryable(e)
+    assert is_retryable(FakeLLMError(503))
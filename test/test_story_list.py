@@ -0,0 +1,84 @@
+import json
+import pytest
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from fastapi import HTTPException
+from src.endpoints import router
+from .fake_db import FakeDB
+
+USER = SimpleNamespace(user_id="u", username="ada")
+NOW = datetime(2024, 5, 1, tzinfo=timezone.utc)
+
+
+def story_doc(story_id: str, updated_at: datetime, user_id: str = "u") -> dict:
+    return {
+        "story_id": story_id, "user_id": user_id, "prompt": "p", "state": {"prompt": "p"},
+        "full_story": {"outline": [], "characters": [], "scenes": []},
+        "version": 1, "created_at": NOW, "updated_at": updated_at,
+    }
+
+
+async def list_page(db, **params):
+    params = {"limit": 20, "cursor": None, "summary": False, "if_none_match": None, **params}
+    response = await router.get_all_stories(db=db, current_user=USER, **params)
+    return json.loads(response.body), response.headers.get("X-Next-Cursor")
+
+
+@pytest.mark.asyncio
+async def test_cursor_pages_through_equal_updated_at_without_duplicates_or_gaps():
+    db = FakeDB()
+    # Four stories share one timestamp, so paging relies on the story_id tie-break
+    stamps = [NOW, NOW, NOW, NOW, NOW - timedelta(minutes=1), NOW + timedelta(minutes=1), NOW - timedelta(minutes=2)]
+    for n, stamp in enumerate(stamps):
+        await db["stories"].insert_one(story_doc(f"s{n}", stamp))
+    await db["stories"].insert_one(story_doc("other", NOW, user_id="someone-else"))
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = await list_page(db, limit=2, cursor=cursor)
+        seen.extend(story["story_id"] for story in page)
+        if cursor is None:
+            break
+
+    expected = [doc["story_id"] for doc in sorted(
+        (story_doc(f"s{n}", stamp) for n, stamp in enumerate(stamps)),
+        key=lambda doc: (doc["updated_at"], doc["story_id"]), reverse=True,
+    )]
+    assert seen == expected
+    assert seen[:5] == ["s5", "s3", "s2", "s1", "s0"]
+
+
+@pytest.mark.asyncio
+async def test_invalid_cursor_is_a_400():
+    with pytest.raises(HTTPException) as exc:
+        await list_page(FakeDB(), cursor="not-a-cursor")
+
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_summary_listing_counts_items_server_side():
+    rows = [{"story_id": "s1", "user_id": "u", "prompt": "p", "outline_count": 3, "characters_count": 2,
+             "scenes_count": 1, "version": 2, "created_at": NOW, "updated_at": NOW}]
+
+    class Cursor:
+        def __aiter__(self):
+            return self.rows()
+
+        async def rows(self):
+            for row in rows:
+                yield row
+
+    db = {"stories": MagicMock(aggregate=AsyncMock(return_value=Cursor()))}
+
+    page, cursor = await list_page(db, summary=True)
+
+    pipeline = db["stories"].aggregate.call_args[0][0]
+    projection = pipeline[-1]["$project"]
+    assert pipeline[0] == {"$match": {"user_id": "u"}}
+    assert pipeline[2] == {"$limit": 21}
+    assert "state" not in projection and "full_story" not in projection
+    assert projection["scenes_count"] == {"$size": {"$ifNull": ["$state.scenes", []]}}
+    assert page[0]["story_number"] == 1 and page[0]["outline_count"] == 3
+    assert cursor is None
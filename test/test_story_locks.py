@@ -0,0 +1,85 @@
+import asyncio
+import pytest
+from contextlib import AsyncExitStack
+from types import SimpleNamespace
+from unittest.mock import patch
+from fastapi import HTTPException
+from src.database.models import StoryContinue
+from src.endpoints import router
+from src.stories.story_locks import KeyedLock, LockBusy
+from .fake_db import FakeDB
+
+
+@pytest.mark.asyncio
+async def test_turns_on_one_story_run_one_after_another():
+    locks = KeyedLock()
+    order = []
+
+    async def turn(key, name):
+        async with locks.hold(key):
+            order.append(f"{name} start")
+            await asyncio.sleep(0.01)
+            order.append(f"{name} end")
+
+    await asyncio.gather(turn("s1", "a"), turn("s1", "b"), turn("s2", "c"))
+
+    assert order.index("a end") < order.index("b start")
+    assert order.index("c start") < order.index("a end")   # other stories are not blocked
+    assert locks.stats() == {"held": 0, "waiting": 0, "acquired": 3, "waited": 1, "rejected": 0}
+    assert locks._locks == {}
+
+
+@pytest.mark.asyncio
+async def test_hold_without_waiting_fails_while_the_key_is_held_or_awaited():
+    locks = KeyedLock()
+
+    async with locks.hold("s1", wait=False):
+        with pytest.raises(LockBusy):
+            async with locks.hold("s1", wait=False):
+                pass
+        async with locks.hold("s2", wait=False):
+            pass
+    async with locks.hold("s1", wait=False):
+        pass
+
+    assert locks.stats()["rejected"] == 1
+    assert locks._locks == {}
+
+
+@pytest.mark.asyncio
+async def test_reject_mode_answers_409_while_the_story_is_locked():
+    locks = KeyedLock()
+    with patch("src.endpoints.router.story_locks", locks), patch("src.endpoints.router.CONTINUE_BUSY_MODE", "reject"):
+        async with AsyncExitStack() as first:
+            await router._start_turn(first, "s1")
+            with pytest.raises(HTTPException) as exc:
+                async with AsyncExitStack() as second:
+                    await router._start_turn(second, "s1")
+            with pytest.raises(HTTPException):
+                router._reject_if_busy("s1")
+            router._reject_if_busy("s2")
+        router._reject_if_busy("s1")
+
+    assert exc.value.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_reject_mode_lets_only_one_of_two_concurrent_streams_start():
+    locks = KeyedLock()
+    db = FakeDB()
+    await db["stories"].insert_one({"story_id": "s1", "user_id": "u1"})
+    user = SimpleNamespace(user_id="u1")
+
+    async def stream():
+        return await router.continue_story_stream("s1", StoryContinue(prompt="go on"), db=db, current_user=user)
+
+    with patch("src.endpoints.router.story_locks", locks), patch("src.endpoints.router.CONTINUE_BUSY_MODE", "reject"):
+        first, second = await asyncio.gather(stream(), stream(), return_exceptions=True)
+
+        assert first.status_code == 200
+        assert isinstance(second, HTTPException) and second.status_code == 409
+
+        # The first stream is dropped before it runs: its response still releases the lock
+        await first.background()
+        assert locks._locks == {}
+        assert (await stream()).status_code == 200
@@ -0,0 +1,85 @@
+import pytest
+from fastapi import HTTPException
+from src.database.models import StoryStateModel
+from src.database.updates import state_delta, version_filter
+
+
+def make_state(**kwargs):
+    defaults = {
+        "prompt": "A heist on Mars",
+        "outline": ["Crew assembles", "Vault is found"],
+        "characters": [{"name": "Ada", "background": "Pilot"}, {"name": "Rex", "background": "Thief"}],
+        "scenes": ["Opening scene"],
+    }
+    defaults.update(kwargs)
+    return StoryStateModel(**defaults)
+
+
+def test_appended_scene_becomes_push():
+    old = make_state()
+    new = make_state(scenes=["Opening scene", "The vault opens"], current_node="done")
+
+    update = state_delta(old, new)
+
+    assert update["$push"] == {"state.scenes": {"$each": ["The vault opens"]}}
+    assert update["$set"] == {"state.current_node": "done"}
+
+
+def test_changed_character_uses_positional_set():
+    old = make_state()
+    characters = [{"name": "Ada", "background": "Pilot"}, {"name": "Rex", "background": "Thief turned hero"}]
+    new = make_state(characters=characters)
+
+    update = state_delta(old, new)
+
+    assert update == {"$set": {"state.characters.1": {"name": "Rex", "background": "Thief turned hero"}}}
+
+
+def test_outline_set_only_when_changed():
+    old = make_state()
+    assert state_delta(old, make_state()) == {}
+
+    new = make_state(outline=["Crew splits up"])
+    assert state_delta(old, new) == {"$set": {"state.outline": ["Crew splits up"]}}
+
+
+def test_version_filter_matches_unversioned_documents():
+    assert version_filter(0) == {"version": {"$exists": False}}
+    assert version_filter(3) == {"version": 3}
+
+
+class OneStepWorkflow:
+    def __init__(self, state: StoryStateModel):
+        self.state = state
+
+    async def astream(self, state, config, stream_mode):
+        yield "updates", {"append_scene_node": {}}
+        yield "values", self.state.model_dump()
+
+
+async def stream_frames(persist) -> list[str]:
+    from src.endpoints.router import _stream_workflow
+
+    state = make_state()
+    return [frame async for frame in _stream_workflow(OneStepWorkflow(state), state, [], persist)]
+
+
+@pytest.mark.asyncio
+async def test_stream_reports_a_version_conflict_with_its_status():
+    async def persist(state):
+        raise HTTPException(status_code=409, detail="Story was modified by another request")
+
+    frames = await stream_frames(persist)
+
+    assert frames[-1] == 'event: error\ndata: {"status":409,"detail":"Story was modified by another request"}\n\n'
+
+
+@pytest.mark.asyncio
+async def test_stream_reports_other_failures_as_generation_errors():
+    async def persist(state):
+        raise RuntimeError("database went away")
+
+    frames = await stream_frames(persist)
+
+    assert frames[0].startswith("event: node")
+    assert frames[-1] == 'event: error\ndata: {"status":500,"detail":"Story generation failed"}\n\n'
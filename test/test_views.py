@@ -0,0 +1,129 @@
+import asyncio
+import json
+import pytest
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from src.database.models import StoryStateModel
+from src.database.updates import dict_delta, merge_updates, state_delta
+from src.endpoints import responses, router
+from src.stories.views import full_story_view, story_view
+
+
+def test_full_story_view_fills_character_defaults_and_numbers_scenes():
+    state = StoryStateModel(prompt="p", outline=["A"], characters=[{"name": "Ada"}], scenes=["One", "Two"])
+
+    view = full_story_view(state)
+
+    assert view == full_story_view(state.model_dump())
+    assert view["characters"] == [{
+        "name": "Ada",
+        "background": "No background available.",
+        "motivations": "No motivations specified.",
+        "role": "No role specified.",
+    }]
+    assert view["scenes"] == [{"scene_number": 1, "content": "One"}, {"scene_number": 2, "content": "Two"}]
+
+
+def test_story_view_builds_full_story_for_legacy_documents():
+    now = datetime.now(timezone.utc)
+    doc = {"story_id": "s", "user_id": "u", "state": {"scenes": ["One"]}, "created_at": now, "updated_at": now}
+
+    assert story_view(doc)["full_story"]["scenes"] == [{"scene_number": 1, "content": "One"}]
+
+
+def test_view_delta_pushes_new_scenes_alongside_state():
+    old = StoryStateModel(prompt="p", outline=["A"], characters=[{"name": "Ada"}], scenes=["One"])
+    new = old.model_copy(deep=True)
+    new.scenes.append("Two")
+    new.characters = [{"name": "Ada", "role": "Pilot"}]
+
+    update = merge_updates(state_delta(old, new), dict_delta(full_story_view(old), full_story_view(new), "full_story"))
+
+    assert update["$push"] == {
+        "state.scenes": {"$each": ["Two"]},
+        "full_story.scenes": {"$each": [{"scene_number": 2, "content": "Two"}]},
+    }
+    assert update["$set"]["full_story.characters.0"]["role"] == "Pilot"
+
+
+def test_dumps_matches_standard_json_with_and_without_orjson(monkeypatch):
+    content = {"updated_at": datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc), "text": "café"}
+    expected = {"updated_at": "2024-01-02T03:04:05Z", "text": "café"}
+
+    assert json.loads(responses.dumps(content)) == expected
+    monkeypatch.setattr(responses, "orjson", None)
+    assert json.loads(responses.dumps(content)) == expected
+
+
+def test_story_etag_changes_with_version_and_honours_if_none_match():
+    now = datetime.now(timezone.utc)
+    etag = router._story_etag({"story_id": "s", "version": 1, "updated_at": now})
+
+    assert etag != router._story_etag({"story_id": "s", "version": 2, "updated_at": now})
+    assert router._etag_matches(f'"other", W/{etag}', etag)
+    assert router._etag_matches("*", etag)
+    assert not router._etag_matches('"other"', etag)
+    assert not router._etag_matches(None, etag)
+
+
+@pytest.mark.asyncio
+async def test_get_story_answers_matching_if_none_match_with_304_from_version_fields():
+    version_doc = {"story_id": "s", "version": 3, "updated_at": datetime.now(timezone.utc)}
+    db = {"stories": MagicMock(find_one=AsyncMock(return_value=version_doc))}
+    user = SimpleNamespace(user_id="u", username="ada")
+
+    response = await router.get_story("s", if_none_match=router._story_etag(version_doc), db=db, current_user=user)
+
+    assert response.status_code == 304
+    assert response.headers["ETag"] == router._story_etag(version_doc)
+    assert response.headers["Cache-Control"] == router.STORY_CACHE_CONTROL
+    db["stories"].find_one.assert_awaited_once_with({"story_id": "s", "user_id": "u"}, router.VERSION_PROJECTION)
+
+
+@pytest.mark.asyncio
+async def test_summary_refresh_is_written_after_the_turn_without_bumping_the_version():
+    state = StoryStateModel(prompt="p", outline=["A", "B"])
+    db = {"stories": MagicMock(update_one=AsyncMock())}
+    fields = {"summary": "A happened.", "summarized_outline": 1, "summarized_scenes": 0}
+
+    with patch("src.endpoints.router.summarize", new=AsyncMock(return_value=fields)):
+        await router._refresh_summary(db, "s", 4, state)
+
+    db["stories"].update_one.assert_awaited_once_with(
+        {"story_id": "s", "version": 4},
+        {"$set": {"state.summary": "A happened.", "state.summarized_outline": 1, "state.summarized_scenes": 0}},
+    )
+
+
+@pytest.mark.asyncio
+async def test_stale_summary_refresh_does_not_make_reject_mode_answer_409():
+    from contextlib import AsyncExitStack
+    from src.stories.story_locks import KeyedLock
+    from .fake_db import FakeDB
+
+    db = FakeDB()
+    await db["stories"].insert_one({"story_id": "s", "version": 5, "state": {"summary": ""}})
+    writing, finish = asyncio.Event(), asyncio.Event()
+    update_one = db["stories"].update_one
+
+    async def slow_update_one(query, update):
+        writing.set()
+        await finish.wait()
+        await update_one(query, update)
+
+    db["stories"].update_one = slow_update_one
+    fields = {"summary": "A happened.", "summarized_outline": 1, "summarized_scenes": 0}
+
+    with patch("src.endpoints.router.summarize", new=AsyncMock(return_value=fields)), \
+         patch("src.endpoints.router.story_locks", KeyedLock()), \
+         patch("src.endpoints.router.CONTINUE_BUSY_MODE", "reject"):
+        # A refresh for version 4, bound to lose now that version 5 is saved
+        refresh = asyncio.create_task(router._refresh_summary(db, "s", 4, StoryStateModel(prompt="p")))
+        await writing.wait()
+        async with AsyncExitStack() as turn:
+            await router._start_turn(turn, "s")
+        finish.set()
+        await refresh
+
+    assert (await db["stories"].find_one({"story_id": "s"}))["state"] == {"summary": ""}